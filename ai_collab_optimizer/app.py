@@ -7,27 +7,168 @@ from the ai_utils modules in a single file.
 
 # Standard library imports
 import os
+import asyncio
+import logging
 import json
+import hashlib
+import tempfile
+import threading
+import time
+import uuid
 import traceback
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Tuple, Set, Optional, Any, Union
-from collections import defaultdict
+from typing import Awaitable, Callable, ClassVar, Iterator, List, Dict, Tuple, Set, Optional, Any, Union
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 
 # Third-party imports
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
+from werkzeug.utils import secure_filename
 import pandas as pd
 import networkx as nx
 import numpy as np
 import plotly
 import plotly.graph_objects as go
+import plotly.io as pio
 import google.generativeai as genai
 from dotenv import load_dotenv
+from cachetools import TTLCache
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the CPM kernels then run as plain Python
+    njit = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Plotly and Flask then fall back to the stdlib json encoder
+    orjson = None
+
+if orjson is not None:
+    pio.json.config.default_engine = 'orjson'
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
 
 # =============================================================================
 # Critical Path Analyzer
 # =============================================================================
 
+def _jit(signature: str):
+    """Compile a kernel with Numba when it is available, otherwise return it unchanged."""
+    if njit is None:
+        return lambda func: func
+    return njit(signature, cache=True)
+
+@_jit('void(int32[:], int32[:], int32[:], int64[:], int64[:], int64[:])')
+def _forward_pass_nb(topo, pred_indptr, pred_idx, dur, es, ef):
+    """Forward CPM pass over CSR predecessor arrays in topological order."""
+    for k in range(topo.shape[0]):
+        i = topo[k]
+        start = 0
+        for j in range(pred_indptr[i], pred_indptr[i + 1]):
+            finish = ef[pred_idx[j]]
+            if finish > start:
+                start = finish
+        es[i] = start
+        ef[i] = start + dur[i]
+
+@_jit('void(int32[:], int32[:], int32[:], int64[:], int64[:], int64[:], int64)')
+def _backward_pass_nb(topo, succ_indptr, succ_idx, dur, ls, lf, project_end):
+    """Backward CPM pass over CSR successor arrays in reverse topological order."""
+    for k in range(topo.shape[0] - 1, -1, -1):
+        i = topo[k]
+        finish = project_end
+        for j in range(succ_indptr[i], succ_indptr[i + 1]):
+            start = ls[succ_idx[j]]
+            if start < finish:
+                finish = start
+        lf[i] = finish
+        ls[i] = finish - dur[i]
+
+def _csr_gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gather the CSR neighbors of several rows at once.
+    
+    Returns:
+        The concatenated neighbor ids and the offset of each row's segment in them
+    """
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    offsets = np.zeros(len(rows), dtype=np.int64)
+    np.cumsum(counts[:-1], out=offsets[1:])
+    positions = np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+    return indices[positions], offsets
+
+def _forward_pass_layered(layers, pred_indptr, pred_idx, dur, es, ef):
+    """
+    Vectorized forward pass used without Numba, one NumPy reduction per topological layer.
+    
+    Nodes within a layer are independent, and every node past the first layer has at
+    least one predecessor, so early starts are a segmented max over the CSR segments.
+    """
+    first = layers[0]
+    es[first] = 0
+    ef[first] = dur[first]
+    for layer in layers[1:]:
+        preds, offsets = _csr_gather(pred_indptr, pred_idx, layer)
+        es[layer] = np.maximum.reduceat(ef[preds], offsets)
+        ef[layer] = es[layer] + dur[layer]
+
+def _backward_pass_py(topo, succ_indptr, succ_idx, dur, ls, lf, project_end):
+    """Plain-Python backward pass used without Numba; runs on lists with a running min."""
+    indptr, succs, dur_local = succ_indptr.tolist(), succ_idx.tolist(), dur.tolist()
+    ls_local, lf_local = ls.tolist(), lf.tolist()
+    for i in reversed(topo.tolist()):
+        finish = project_end
+        for s in succs[indptr[i]:indptr[i + 1]]:
+            start = ls_local[s]
+            if start < finish:
+                finish = start
+        lf_local[i] = finish
+        ls_local[i] = finish - dur_local[i]
+    ls[:] = ls_local
+    lf[:] = lf_local
+
+# Indexing NumPy arrays element by element is slow in the interpreter, so without
+# Numba the backward pass runs on plain lists instead
+_backward_pass = _backward_pass_nb if njit is not None else _backward_pass_py
+
+def _build_csr(neighbors: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack per-node neighbor lists into CSR (indptr, indices) arrays."""
+    indptr = np.zeros(len(neighbors) + 1, dtype=np.int32)
+    np.cumsum([len(n) for n in neighbors], out=indptr[1:])
+    indices = np.fromiter((i for n in neighbors for i in n), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+# Translation table normalizing ';'-separated dependency lists to ','
+_DEP_TRANS = str.maketrans(';', ',')
+
+def _is_missing(value: Any) -> bool:
+    """Whether a task field is empty: None, or NaN (an empty cell in a CSV read by pandas)."""
+    return value is None or (isinstance(value, float) and value != value)
+
+def _task_field(task: Dict, fields: Tuple[str, ...], default: Any) -> Any:
+    """Return the first of ``fields`` the task has a non-empty value for, else ``default``."""
+    for field in fields:
+        value = task.get(field)
+        if not _is_missing(value):
+            return value
+    return default
+
+# Synthetic endpoints used when ranking start-to-end paths by total duration
+_PATH_SOURCE = ('__source__',)
+_PATH_SINK = ('__sink__',)
+
+# Memory budget (bytes) for the descendant-count bitsets; past it, targets are swept in blocks
+DESCENDANT_BITSET_BYTES = 64 * 1024 * 1024
+# Number of set bits in each byte value
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
 class CriticalPathAnalyzer:
     """A class to analyze project workflows and identify critical paths and bottlenecks."""
     
@@ -39,7 +180,12 @@ class CriticalPathAnalyzer:
             tasks: List of task dictionaries with at least 'id', 'duration', and 'dependencies' keys.
         """
         self.tasks = tasks
+        # Query results are memoized, so analyzers shared through build_analyzer answer repeats in O(1)
+        self._critical_path = None
+        self._schedule = None
+        self._bottlenecks = {}
         self.graph = self._build_dependency_graph()
+        self._index_graph()
         self.forward_pass()
         self.backward_pass()
         
@@ -50,46 +196,45 @@ class CriticalPathAnalyzer:
         if not self.tasks:
             return G
             
-        # Add nodes with task data
+        # The duration column (and its unit) is detected once from the columns of all tasks
+        duration_of = self._duration_extractor({field for task in self.tasks for field in task})
+        
+        # Add nodes with task data; empty fields fall back to the defaults
         for task in self.tasks:
             # Support both old and new column names
-            task_id = str(task.get('Task ID', task.get('task_id', ''))).strip()
+            task_id = str(_task_field(task, ('Task ID', 'task_id'), '')).strip()
             if not task_id:
                 continue
                 
             # Get task name with fallback to task_id
-            task_name = task.get('Task Name', task.get('task_name', f'Task {task_id}'))
+            task_name = _task_field(task, ('Task Name', 'task_name', 'name'), f'Task {task_id}')
             
-            # Get duration (convert from days to hours if needed)
-            duration_days = float(task.get('Duration (days)', task.get('duration', task.get('estimated_time', 0))))
-            
-            # If duration is in days (likely from new format), convert to hours (assuming 8-hour workdays)
-            if 'Duration (days)' in task or 'duration' in task:
-                duration = int(duration_days * 8)  # Convert days to hours
-            else:
-                duration = int(duration_days)  # Already in hours
+            duration = duration_of(task)
                 
             G.add_node(task_id, 
                       name=task_name,
                       duration=max(1, duration),  # Ensure minimum duration of 1 hour
-                      resource=task.get('Resource', task.get('assigned_to', 'Unassigned')),
-                      early_start=0,
-                      early_finish=0,
-                      late_start=float('inf'),
-                      late_finish=float('inf'),
-                      slack=0,
-                      is_critical=False)
+                      resource=_task_field(task, ('Resource', 'assigned_to'), 'Unassigned'))
         
         # Add edges for dependencies
         for task in self.tasks:
-            task_id = str(task.get('Task ID', task.get('task_id', ''))).strip()
+            task_id = str(_task_field(task, ('Task ID', 'task_id'), '')).strip()
             if not task_id or task_id not in G.nodes:
                 continue
                 
             # Get dependencies (support both comma and semicolon separated)
-            deps = task.get('Dependencies', task.get('dependencies', ''))
+            deps = _task_field(task, ('Dependencies', 'dependencies'), '')
             if isinstance(deps, str):
-                deps = [d.strip() for d in deps.replace(';', ',').split(',') if d.strip()]
+                deps = deps.translate(_DEP_TRANS)
+                if ',' not in deps:
+                    # Common case of zero or one dependency
+                    deps = deps.strip()
+                    deps = [deps] if deps else []
+                else:
+                    deps = [d for d in map(str.strip, deps.split(',')) if d]
+            elif not isinstance(deps, (list, tuple, set)):
+                # A single numeric dependency, as pandas reads it (possibly as a float)
+                deps = [int(deps) if isinstance(deps, float) and deps.is_integer() else deps]
             
             # Add edges for each dependency
             for dep_id in deps:
@@ -99,73 +244,131 @@ class CriticalPathAnalyzer:
         
         return G
     
-    def forward_pass(self) -> None:
-        """Perform forward pass to calculate early start and early finish times."""
-        # Perform topological sort to process nodes in dependency order
+    @staticmethod
+    def _duration_extractor(columns: Set[str]) -> Callable[[Dict], int]:
+        """
+        Pick the function that reads a task's duration in hours, based on the task list's columns.
+        
+        Args:
+            columns: Every field name used by any task in the list
+            
+        Returns:
+            Function mapping a task dictionary to its duration in hours (0 if its cell is empty)
+        """
+        # If duration is in days (likely from new format), convert to hours (assuming 8-hour workdays)
+        if 'Duration (days)' in columns:
+            return lambda task: int(float(_task_field(task, ('Duration (days)',), 0)) * 8)
+        if 'duration' in columns:
+            return lambda task: int(float(_task_field(task, ('duration',), 0)) * 8)
+        # Hours, as exported by GraphEditor.export_tasks
+        if 'Duration' in columns:
+            return lambda task: int(float(_task_field(task, ('Duration',), 0)))
+        # Already in hours
+        return lambda task: int(float(_task_field(task, ('estimated_time',), 0)))
+    
+    def _index_graph(self) -> None:
+        """
+        Assign dense integer ids to the nodes and set up the CPM state.
+        
+        CPM values are kept as parallel NumPy arrays indexed by node id (see
+        ``self._nodes``) instead of per-node graph attributes, and adjacency is
+        packed into CSR arrays so both passes avoid dict lookups.
+        """
+        G = self.graph
+        nodes_data = G.nodes
+        self._nodes = list(nodes_data)
+        id_of = self._id_of = {node: i for i, node in enumerate(self._nodes)}
+        n = len(self._nodes)
+        self._dur = np.fromiter((nodes_data[node]['duration'] for node in self._nodes), dtype=np.int64, count=n)
+        self._es = np.zeros(n, dtype=np.int64)
+        self._ef = np.zeros(n, dtype=np.int64)
+        # The backward pass assigns every late start/finish exactly once (successors
+        # first), so these are left uninitialized
+        self._ls = np.empty(n, dtype=np.int64)
+        self._lf = np.empty(n, dtype=np.int64)
+        self._slack = np.zeros(n, dtype=np.int64)
+        self._is_critical = np.zeros(n, dtype=bool)
+        self._project_end = 0
+        self._impact = None
+        
+        # Iterate the DiGraph adjacency dicts directly rather than materializing
+        # predecessors()/successors() lists per node
+        pred, succ = G.pred, G.succ
+        self._pred_indptr, self._pred_idx = _build_csr([[id_of[p] for p in pred[node]] for node in self._nodes])
+        self._succ_indptr, self._succ_idx = _build_csr([[id_of[s] for s in succ[node]] for node in self._nodes])
+        
+        # Topological order (as node ids), computed once for both passes
         try:
-            topo_order = list(nx.topological_sort(self.graph))
+            self._layers = self._kahn_layers()
+            self._topo_order = np.concatenate(self._layers) if self._layers else np.zeros(0, dtype=np.int32)
         except nx.NetworkXUnfeasible:
             # Handle cycles in the graph
-            print("Warning: Cycle detected in task dependencies")
-            return
+            logger.warning("Cycle detected in task dependencies")
+            self._layers = None
+            self._topo_order = None
+            # No backward pass will run to fill the late times
+            self._ls.fill(0)
+            self._lf.fill(0)
+    
+    def _kahn_layers(self) -> List[np.ndarray]:
+        """
+        Split the node ids into topological layers with a frontier-at-a-time Kahn's algorithm.
         
-        # Forward pass
-        for node in topo_order:
-            predecessors = list(self.graph.predecessors(node))
-            
-            if not predecessors:
-                # No dependencies, can start at time 0
-                self.graph.nodes[node]['early_start'] = 0
-            else:
-                # Early start is max of all predecessors' early finish times
-                max_ef = max(self.graph.nodes[pred]['early_finish'] for pred in predecessors)
-                self.graph.nodes[node]['early_start'] = max_ef
+        Each layer holds the nodes whose last predecessor sits in the previous
+        layer; concatenating the layers gives a topological order.
+        
+        Returns:
+            List of int32 arrays of node ids, one per layer
             
-            # Early finish is early start + duration
-            duration = self.graph.nodes[node]['duration']
-            self.graph.nodes[node]['early_finish'] = self.graph.nodes[node]['early_start'] + duration
+        Raises:
+            nx.NetworkXUnfeasible: If the graph contains a cycle
+        """
+        indeg = np.diff(self._pred_indptr)
+        frontier = np.nonzero(indeg == 0)[0].astype(np.int32)
+        
+        layers = []
+        placed = 0
+        while frontier.size:
+            layers.append(frontier)
+            placed += frontier.size
+            succs, _ = _csr_gather(self._succ_indptr, self._succ_idx, frontier)
+            np.subtract.at(indeg, succs, 1)
+            candidates = np.unique(succs)
+            frontier = candidates[indeg[candidates] == 0]
+        
+        if placed != len(self._nodes):
+            raise nx.NetworkXUnfeasible("Graph contains a cycle")
+        return layers
+    
+    def forward_pass(self) -> None:
+        """Perform forward pass to calculate early start and early finish times."""
+        if self._topo_order is None:
+            return
+        
+        if njit is not None:
+            _forward_pass_nb(self._topo_order, self._pred_indptr, self._pred_idx,
+                             self._dur, self._es, self._ef)
+        elif self._layers:
+            _forward_pass_layered(self._layers, self._pred_indptr, self._pred_idx,
+                                  self._dur, self._es, self._ef)
+        
+        # Project end time (max of all early finish times), reused by every later query
+        if self._nodes:
+            self._project_end = int(self._ef.max())
     
     def backward_pass(self) -> None:
         """Perform backward pass to calculate late start and late finish times."""
-        if not self.graph.nodes:
-            return
-            
-        # Get nodes in reverse topological order
-        try:
-            reverse_topo = list(reversed(list(nx.topological_sort(self.graph))))
-        except nx.NetworkXUnfeasible:
-            print("Warning: Cycle detected in task dependencies")
+        if not self._nodes or self._topo_order is None:
             return
         
-        # Initialize project end time (max of all early finish times)
-        project_end = max(self.graph.nodes[node]['early_finish'] for node in self.graph.nodes)
+        _backward_pass(self._topo_order, self._succ_indptr, self._succ_idx,
+                       self._dur, self._ls, self._lf, self._project_end)
         
-        # Initialize all nodes with default values
-        for node in self.graph.nodes:
-            self.graph.nodes[node]['late_finish'] = float('inf')
-            self.graph.nodes[node]['late_start'] = float('inf')
+        # Calculate slack (total float)
+        self._slack = self._ls - self._es
         
-        # Backward pass
-        for node in reverse_topo:
-            successors = list(self.graph.successors(node))
-            duration = self.graph.nodes[node]['duration']
-            
-            if not successors:
-                # No successors, set late finish to project end time
-                self.graph.nodes[node]['late_finish'] = project_end
-                self.graph.nodes[node]['late_start'] = project_end - duration
-            else:
-                # Late finish is min of all successors' late start times
-                if successors:  # Check again in case there are no successors
-                    min_ls = min(self.graph.nodes[succ]['late_start'] for succ in successors)
-                    self.graph.nodes[node]['late_finish'] = min_ls
-                    self.graph.nodes[node]['late_start'] = min_ls - duration
-            
-            # Calculate slack (total float)
-            self.graph.nodes[node]['slack'] = self.graph.nodes[node]['late_start'] - self.graph.nodes[node]['early_start']
-            
-            # Identify critical tasks (zero slack or very small slack due to floating point)
-            self.graph.nodes[node]['is_critical'] = abs(self.graph.nodes[node]['slack']) < 1e-6
+        # Identify critical tasks (zero slack or very small slack due to floating point)
+        self._is_critical = np.abs(self._slack) < 1e-6
     
     def get_critical_path(self) -> List[Dict]:
         """
@@ -174,31 +377,67 @@ class CriticalPathAnalyzer:
         Returns:
             List of task dictionaries in the critical path.
         """
-        critical_nodes = [node for node in self.graph.nodes if self.graph.nodes[node]['is_critical']]
-        
-        # Sort by early start time
-        critical_nodes_sorted = sorted(critical_nodes, 
-                                     key=lambda x: self.graph.nodes[x]['early_start'])
+        if self._critical_path is not None:
+            return self._critical_path
+            
+        # Sort by early start time. The topological order alone is not enough here:
+        # parallel zero-slack chains interleave in it without being ES-ordered.
+        critical_idx = np.nonzero(self._is_critical)[0]
+        critical_idx = critical_idx[np.argsort(self._es[critical_idx], kind='stable')]
+        
+        # Get task details for the critical path in a single pass over the selected rows
+        nodes_data = self.graph.nodes
+        columns = zip(critical_idx.tolist(),
+                      self._dur[critical_idx].tolist(),
+                      self._es[critical_idx].tolist(),
+                      self._ef[critical_idx].tolist(),
+                      self._ls[critical_idx].tolist(),
+                      self._lf[critical_idx].tolist(),
+                      self._slack[critical_idx].tolist())
         
-        # Get task details for the critical path
         critical_path = []
-        for node in critical_nodes_sorted:
-            node_data = self.graph.nodes[node]
+        for i, duration, es, ef, ls, lf, slack in columns:
+            node = self._nodes[i]
+            node_data = nodes_data[node]
             critical_path.append({
                 'id': node,
                 'name': node_data.get('name', f'Task {node}'),
-                'duration': node_data.get('duration', 0),
-                'early_start': node_data.get('early_start', 0),
-                'early_finish': node_data.get('early_finish', 0),
-                'late_start': node_data.get('late_start', 0),
-                'late_finish': node_data.get('late_finish', 0),
-                'slack': node_data.get('slack', 0),
-                'is_critical': node_data.get('is_critical', False),
+                'duration': duration,
+                'early_start': es,
+                'early_finish': ef,
+                'late_start': ls,
+                'late_finish': lf,
+                'slack': slack,
+                'is_critical': True,
                 'resource': node_data.get('resource', 'Unassigned')
             })
         
+        self._critical_path = critical_path
         return critical_path
         
+    def get_schedule(self) -> List[Dict]:
+        """
+        Get every task with its early start, in the task format of GraphEditor.export_tasks.
+        
+        Returns:
+            List of task dictionaries with 'Task ID', 'Task Name', 'Duration' (hours),
+            'Resource', 'Dependencies' and 'early_start' keys, in node order.
+        """
+        if self._schedule is not None:
+            return self._schedule
+        
+        nodes_data, pred = self.graph.nodes, self.graph.pred
+        self._schedule = [{
+            'Task ID': node,
+            'Task Name': nodes_data[node]['name'],
+            'Duration': duration,
+            'Resource': nodes_data[node]['resource'],
+            'Dependencies': list(pred[node]),
+            'early_start': es
+        } for node, duration, es in zip(self._nodes, self._dur.tolist(), self._es.tolist())]
+        
+        return self._schedule
+    
     def get_minimum_viable_paths(self, max_paths: int = 5) -> List[List[Dict]]:
         """
         Find the top N minimum viable paths in the project.
@@ -209,94 +448,157 @@ class CriticalPathAnalyzer:
         Returns:
             List of paths, where each path is a list of task dictionaries
         """
+        if not self._nodes or max_paths <= 0 or self._topo_order is None:
+            # Cyclic graphs have no start-to-end paths to rank
+            return []
+        
+        # Paths come out of the generator in ascending duration, so stop after max_paths
+        paths = []
+        for _, path in islice(self._iter_paths_by_duration(), max_paths):
+            # Create path with task details
+            path_tasks = []
+            for node in path:
+                node_data = self.graph.nodes[node]
+                path_tasks.append({
+                    'id': node,
+                    'name': node_data.get('name', f'Task {node}'),
+                    'duration': node_data.get('duration', 0),
+                    'resource': node_data.get('resource', 'Unassigned')
+                })
+            paths.append(path_tasks)
+        
+        return paths
+    
+    def _iter_paths_by_duration(self) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Lazily yield start-to-end paths in ascending order of total duration.
+        
+        Yields:
+            (duration, path) tuples, where path is a list of node ids
+        """
         # Find all start nodes (nodes with no incoming edges)
-        start_nodes = [node for node in self.graph.nodes if self.graph.in_degree(node) == 0]
+        start_nodes = [node for node, preds in self.graph.pred.items() if not preds]
         # Find all end nodes (nodes with no outgoing edges)
-        end_nodes = [node for node in self.graph.nodes if self.graph.out_degree(node) == 0]
-        
-        all_paths = []
-        
-        # Find all paths from start to end nodes
-        for start in start_nodes:
-            for end in end_nodes:
-                try:
-                    # Find all simple paths from start to end
-                    paths = list(nx.all_simple_paths(self.graph, start, end))
-                    for path in paths:
-                        # Calculate total duration of the path
-                        path_duration = sum(self.graph.nodes[node]['duration'] for node in path)
-                        # Create path with task details
-                        path_tasks = []
-                        for node in path:
-                            node_data = self.graph.nodes[node]
-                            path_tasks.append({
-                                'id': node,
-                                'name': node_data.get('name', f'Task {node}'),
-                                'duration': node_data.get('duration', 0),
-                                'resource': node_data.get('resource', 'Unassigned')
-                            })
-                        all_paths.append({
-                            'path': path_tasks,
-                            'duration': path_duration,
-                            'is_critical': all(self.graph.nodes[node]['is_critical'] for node in path)
-                        })
-                except nx.NetworkXNoPath:
-                    continue
-        
-        # Sort paths by duration and take top N
-        all_paths.sort(key=lambda x: x['duration'])
-        return [path_info['path'] for path_info in all_paths[:max_paths]]
-    
-    def identify_bottlenecks(self, threshold: float = 0.2) -> List[Dict]:
+        end_nodes = [node for node, succs in self.graph.succ.items() if not succs]
+        if not start_nodes or not end_nodes:
+            return
+        
+        # Weight each edge by the duration of the task it leads into and join all start/end
+        # nodes through a synthetic source/sink, so a shortest source-sink path is the
+        # path with the smallest total duration
+        weighted = nx.DiGraph()
+        weighted.add_edges_from((u, v, {'w': int(self._dur[self._id_of[v]])}) for u, v in self.graph.edges)
+        weighted.add_edges_from((_PATH_SOURCE, node, {'w': int(self._dur[self._id_of[node]])}) for node in start_nodes)
+        weighted.add_edges_from((node, _PATH_SINK, {'w': 0}) for node in end_nodes)
+        
+        # Yen's algorithm computes each next-shortest path only when it is requested
+        try:
+            for path in nx.shortest_simple_paths(weighted, _PATH_SOURCE, _PATH_SINK, weight='w'):
+                # Drop the synthetic endpoints
+                path = path[1:-1]
+                yield int(self._dur[[self._id_of[node] for node in path]].sum()), path
+        except nx.NetworkXNoPath:
+            return
+    
+    def _descendant_counts(self) -> np.ndarray:
+        """
+        Count the descendants of every node with reverse-topological sweeps over bitsets.
+        
+        Reachability is propagated as packed uint64 bitsets (one row of words per
+        node), merged one topological layer at a time with a segmented OR over the
+        successors' rows instead of a fresh BFS per node. To keep the bitsets within
+        DESCENDANT_BITSET_BYTES, large graphs are swept once per block of target
+        nodes and the counts summed.
+        """
+        if self._topo_order is None:
+            # Cyclic graphs have no topological order; fall back to one BFS per node
+            return np.array([len(nx.descendants(self.graph, node)) for node in self._nodes], dtype=np.int64)
+        
+        n = len(self._nodes)
+        words = (n + 63) // 64
+        block = max(1, min(words, DESCENDANT_BITSET_BYTES // (8 * max(n, 1))))
+        bits = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+        indptr, succ_idx = self._succ_indptr, self._succ_idx
+        
+        # Successors-first layers, keeping only nodes that have successors to merge
+        layers = []
+        for layer in reversed(self._layers):
+            layer = layer[indptr[layer + 1] > indptr[layer]]
+            if layer.size:
+                succs, offsets = _csr_gather(indptr, succ_idx, layer)
+                owners = np.repeat(layer, np.diff(np.append(offsets, succs.size)))
+                layers.append((layer, succs, offsets, owners))
+        
+        counts = np.zeros(n, dtype=np.int64)
+        # Each sweep tracks reachability of the targets in words [first, first + width)
+        for first in range(0, words, block):
+            width = min(block, words - first)
+            reach = np.zeros((n, width), dtype=np.uint64)
+            for layer, succs, offsets, owners in layers:
+                reach[layer] = np.bitwise_or.reduceat(reach[succs], offsets, axis=0)
+                word = (succs >> 6) - first
+                inside = (word >= 0) & (word < width)
+                np.bitwise_or.at(reach, (owners[inside], word[inside]), bits[succs[inside] & 63])
+            counts += _POPCOUNT8[reach.view(np.uint8)].sum(axis=1, dtype=np.int64)
+        
+        return counts
+    
+    def identify_bottlenecks(self, threshold: float = 0.2, limit: Optional[int] = None) -> List[Dict]:
         """
         Identify bottleneck tasks in the project.
         
         Args:
             threshold: Slack threshold as a percentage of project duration to consider a task a bottleneck.
                       Tasks with slack less than this threshold are considered bottlenecks.
+            limit: Optional maximum number of bottlenecks to return (highest impact first)
                       
         Returns:
             List of dictionaries containing bottleneck task information.
         """
-        if not self.graph.nodes:
+        if not self._nodes:
             return []
         
-        project_duration = max((self.graph.nodes[node]['early_finish'] for node in self.graph.nodes), default=0)
-        slack_threshold = project_duration * threshold
+        cache_key = (threshold, limit)
+        if cache_key in self._bottlenecks:
+            return self._bottlenecks[cache_key]
+        
+        slack_threshold = self._project_end * threshold
+        
+        # Impact is the number of dependent tasks
+        if self._impact is None:
+            self._impact = self._descendant_counts()
+        impact = self._impact
+        
+        # Only consider tasks with a duration that impact multiple tasks
+        mask = (self._slack <= slack_threshold) & (impact > 1) & (self._dur > 0)
+        idx = np.nonzero(mask)[0]
+        
+        # Sort by impact (highest first), then by slack
+        order = idx[np.lexsort((self._slack[idx], -impact[idx]))]
+        if limit is not None:
+            order = order[:limit]
         
         bottlenecks = []
-        for node in self.graph.nodes:
+        for i in order:
+            node = self._nodes[i]
             node_data = self.graph.nodes[node]
             
-            # Skip nodes with no duration
-            if node_data.get('duration', 0) <= 0:
-                continue
-                
-            # Calculate impact (number of dependent tasks)
-            impact = len(nx.descendants(self.graph, node))
+            # Add bottleneck data to node
+            node_data['is_bottleneck'] = True
+            node_data['impact'] = int(impact[i])
             
-            # Check if this is a bottleneck
-            slack = node_data.get('slack', float('inf'))
-            if slack <= slack_threshold and impact > 1:  # Only consider nodes that impact multiple tasks
-                # Add bottleneck data to node
-                self.graph.nodes[node]['is_bottleneck'] = True
-                self.graph.nodes[node]['impact'] = impact
-                
-                bottlenecks.append({
-                    'id': node,
-                    'name': node_data.get('name', f'Task {node}'),
-                    'duration': node_data.get('duration', 0),
-                    'resource': node_data.get('resource', 'Unassigned'),
-                    'impact': impact,
-                    'slack': slack,
-                    'early_start': node_data.get('early_start', 0),
-                    'late_start': node_data.get('late_start', 0)
-                })
-        
-        # Sort by impact (highest first)
-        return sorted(bottlenecks, key=lambda x: x['impact'], reverse=True)
-        bottlenecks.sort(key=lambda x: (-x['impact'], x['slack']))
+            bottlenecks.append({
+                'id': node,
+                'name': node_data.get('name', f'Task {node}'),
+                'duration': int(self._dur[i]),
+                'resource': node_data.get('resource', 'Unassigned'),
+                'impact': int(impact[i]),
+                'slack': int(self._slack[i]),
+                'early_start': int(self._es[i]),
+                'late_start': int(self._ls[i])
+            })
         
+        self._bottlenecks[cache_key] = bottlenecks
         return bottlenecks
     
     def get_project_duration(self) -> float:
@@ -306,20 +608,70 @@ class CriticalPathAnalyzer:
         Returns:
             Total project duration in the same units as task durations.
         """
-        if not self.graph.nodes:
-            return 0
-        return max(self.graph.nodes[node]['early_finish'] for node in self.graph.nodes)
+        return self._project_end
+
+# Task fields read by CriticalPathAnalyzer._build_dependency_graph
+_ANALYZER_FIELDS = ('Task ID', 'task_id', 'Task Name', 'task_name', 'name', 'Duration (days)', 'Duration',
+                    'duration', 'estimated_time', 'Resource', 'assigned_to', 'Dependencies', 'dependencies')
+
+def _fingerprint_value(value: Any) -> Any:
+    """Make a task field hashable: empty values become None and sequences become tuples."""
+    if _is_missing(value):
+        return None
+    return tuple(value) if isinstance(value, (list, tuple, set)) else value
+
+def _task_fingerprint(tasks: List[Dict]) -> Tuple:
+    """
+    Build a hashable, order-preserving fingerprint of the fields the analyzer reads.
+    
+    NaN fields (empty cells in a CSV read by pandas) are kept as None, which compares equal
+    between requests, so the columns stay visible and the analyzer's defaults apply to them.
+    """
+    return tuple(
+        tuple((field, _fingerprint_value(task[field])) for field in _ANALYZER_FIELDS if field in task)
+        for task in tasks
+    )
+
+@lru_cache(maxsize=32)
+def _analyze(fingerprint: Tuple) -> 'CriticalPathAnalyzer':
+    """Construct (and memoize) an analyzer from a task fingerprint."""
+    return CriticalPathAnalyzer([dict(fields) for fields in fingerprint])
+
+def build_analyzer(tasks: List[Dict]) -> CriticalPathAnalyzer:
+    """
+    Build a CriticalPathAnalyzer for the tasks, reusing a cached one for an identical task list.
+    
+    The returned analyzer (and the lists its query methods return) may be shared
+    between requests and should be treated as read-only.
+    
+    Args:
+        tasks: List of task dictionaries
+        
+    Returns:
+        Analyzer with the forward/backward passes already run
+    """
+    return _analyze(_task_fingerprint(tasks))
 
 # =============================================================================
 # Graph Editor
 # =============================================================================
 
+# Upper bound on the cycles listed by GraphEditor.validate_graph
+MAX_REPORTED_CYCLES = 10
+
 class GraphEditor:
     """A class for interactive manipulation of project graphs."""
     
     def __init__(self):
         """Initialize an empty graph."""
         self.graph = nx.DiGraph()
+        # Bumped on every change, so exports can be cached per version
+        self._version = 0
+    
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever the graph is modified."""
+        return self._version
     
     def add_node(self, node_id: str, label: str = "", duration: int = 0, 
                 resource: str = "Unassigned", dependencies: str = "") -> None:
@@ -338,6 +690,7 @@ class GraphEditor:
                           duration=duration,
                           resource=resource,
                           dependencies=dependencies)
+        self._version += 1
     
     def remove_node(self, node_id: str) -> bool:
         """
@@ -351,6 +704,7 @@ class GraphEditor:
         """
         if node_id in self.graph:
             self.graph.remove_node(node_id)
+            self._version += 1
             return True
         return False
     
@@ -367,6 +721,7 @@ class GraphEditor:
         """
         if source in self.graph and target in self.graph:
             self.graph.add_edge(source, target)
+            self._version += 1
             return True
         return False
     
@@ -383,6 +738,7 @@ class GraphEditor:
         """
         if self.graph.has_edge(source, target):
             self.graph.remove_edge(source, target)
+            self._version += 1
             return True
         return False
     
@@ -401,6 +757,7 @@ class GraphEditor:
             for key, value in kwargs.items():
                 if value is not None:  # Only update if value is not None
                     self.graph.nodes[node_id][key] = value
+            self._version += 1
             return True
         return False
     
@@ -416,6 +773,7 @@ class GraphEditor:
     def clear_graph(self) -> None:
         """Clear all nodes and edges from the graph."""
         self.graph.clear()
+        self._version += 1
     
     def export_graph(self, format: str = 'json') -> Union[Dict, str]:
         """
@@ -448,11 +806,33 @@ class GraphEditor:
                 self.graph = nx.parse_gml(data)
             else:  # Default to JSON
                 self.graph = nx.node_link_graph(data)
+            self._version += 1
             return True
         except Exception as e:
-            print(f"Error importing graph: {e}")
+            logger.error("Error importing graph: %s", e)
             return False
     
+    def load_tasks(self, tasks: List[Dict]) -> None:
+        """
+        Replace the graph with tasks in the format of export_tasks.
+        
+        The new graph is built first and swapped in whole, so concurrent exports
+        see either the old graph or the new one.
+        
+        Args:
+            tasks: List of task dictionaries, e.g. from CriticalPathAnalyzer.get_schedule
+        """
+        graph = nx.DiGraph()
+        for task in tasks:
+            graph.add_node(task['Task ID'],
+                           label=task['Task Name'],
+                           duration=task['Duration'],
+                           resource=task['Resource'],
+                           dependencies=','.join(map(str, task['Dependencies'])))
+        graph.add_edges_from((dep, task['Task ID']) for task in tasks for dep in task['Dependencies'])
+        self.graph = graph
+        self._version += 1
+    
     def export_tasks(self) -> List[Dict]:
         """
         Export tasks in a format suitable for the CriticalPathAnalyzer.
@@ -461,13 +841,14 @@ class GraphEditor:
             List of task dictionaries
         """
         tasks = []
+        pred = self.graph.pred
         for node_id, node_data in self.graph.nodes(data=True):
             task = {
                 'Task ID': node_id,
                 'Task Name': node_data.get('label', f'Task {node_id}'),
                 'Duration': node_data.get('duration', 0),
                 'Resource': node_data.get('resource', 'Unassigned'),
-                'Dependencies': list(self.graph.predecessors(node_id))
+                'Dependencies': list(pred[node_id])
             }
             tasks.append(task)
         return tasks
@@ -479,9 +860,10 @@ class GraphEditor:
         Returns:
             Dictionary with validation results
         """
+        is_dag = nx.is_directed_acyclic_graph(self.graph)
         result = {
-            'is_dag': nx.is_directed_acyclic_graph(self.graph),
-            'has_cycles': not nx.is_directed_acyclic_graph(self.graph),
+            'is_dag': is_dag,
+            'has_cycles': not is_dag,
             'nodes': len(self.graph.nodes()),
             'edges': len(self.graph.edges()),
             'connected_components': nx.number_weakly_connected_components(self.graph)
@@ -490,7 +872,7 @@ class GraphEditor:
         # Find cycles if they exist
         if result['has_cycles']:
             try:
-                result['cycles'] = list(nx.simple_cycles(self.graph))
+                result['cycles'] = list(islice(nx.simple_cycles(self.graph), MAX_REPORTED_CYCLES))
             except Exception as e:
                 result['cycle_error'] = str(e)
         
@@ -523,41 +905,58 @@ class GanttChart:
         if not tasks:
             return {}
             
-        # Process tasks
-        processed_tasks = []
-        resource_colors = {}
-        
-        for i, task in enumerate(tasks):
-            task_id = task.get('Task ID', task.get('task_id', f'task_{i}'))
-            name = task.get('Task Name', task.get('task_name', f'Task {task_id}'))
-            start = task.get('early_start', 0)
-            duration = int(float(task.get('Duration', task.get('duration', 0))))
-            resource = task.get('Resource', task.get('resource', 'Unassigned'))
-            
-            # Assign color based on resource
-            if resource not in resource_colors:
-                resource_colors[resource] = self.colors[len(resource_colors) % len(self.colors)]
-            
-            processed_tasks.append({
-                'Task': name,
-                'Start': start,
-                'Finish': start + duration,
-                'Resource': resource,
-                'Duration': duration,
-                'Task_ID': task_id,
-                'Color': resource_colors[resource]
-            })
+        # Build one frame from the tasks; legacy column names are coalesced row-wise
+        df = pd.DataFrame(tasks, dtype=object)
+        task_id = self._coalesce(df, ['Task ID', 'task_id'], 'task_' + pd.Series(range(len(df)), dtype=str))
+        name = self._coalesce(df, ['Task Name', 'task_name'], 'Task ' + task_id.astype(str))
+        start = pd.to_numeric(self._coalesce(df, ['early_start'], 0))
+        duration = pd.to_numeric(self._coalesce(df, ['Duration', 'duration'], 0)).astype(float).astype(int)
+        resource = self._coalesce(df, ['Resource', 'resource'], 'Unassigned')
+        
+        # Assign colors per resource, cycling through the palette in order of first appearance
+        unique_resources = resource.unique()
+        color_idx = np.arange(len(unique_resources)) % len(self.colors)
+        resource_colors = dict(zip(unique_resources, (self.colors[i] for i in color_idx)))
+        
+        gantt = pd.DataFrame({
+            'Task': name,
+            'Start': start,
+            'Finish': start + duration,
+            'Resource': resource,
+            'Duration': duration,
+            'Task_ID': task_id,
+            'Color': resource.map(resource_colors)
+        })
         
         # Sort tasks by start time
-        processed_tasks.sort(key=lambda x: x['Start'])
+        gantt = gantt.sort_values('Start', kind='stable')
         
         return {
-            'tasks': processed_tasks,
+            'tasks': gantt.to_dict('records'),
             'resources': list(resource_colors.keys()),
             'resource_colors': resource_colors,
-            'project_duration': max((task['Finish'] for task in processed_tasks), default=0)
+            'project_duration': gantt['Finish'].max().item()
         }
     
+    @staticmethod
+    def _coalesce(df: pd.DataFrame, columns: List[str], default: Any) -> pd.Series:
+        """
+        Take the first non-missing value per row across the given columns.
+        
+        Args:
+            df: Task frame
+            columns: Candidate column names in order of preference
+            default: Scalar or Series used where every candidate is missing
+            
+        Returns:
+            Series aligned with df
+        """
+        result = pd.Series(None, index=df.index, dtype=object)
+        for column in columns:
+            if column in df.columns:
+                result = result.fillna(df[column])
+        return result.fillna(default)
+    
     def generate_gantt_chart(self, tasks: List[Dict], output_format: str = 'plotly') -> Any:
         """
         Generate a Gantt chart.
@@ -576,21 +975,21 @@ class GanttChart:
         # Create figure
         fig = go.Figure()
         
-        # Add bars for each task
-        for task in data['tasks']:
-            fig.add_trace(go.Bar(
-                name=task['Task'],
-                x=[task['Duration']],
-                y=[task['Task']],
-                base=task['Start'],
-                orientation='h',
-                marker_color=task['Color'],
-                text=f"{task['Task']}<br>Duration: {task['Duration']} days<br>Resource: {task['Resource']}",
-                hoverinfo='text',
-                textposition='inside',
-                texttemplate='%{text}',
-                textfont=dict(size=10)
-            ))
+        # Add all tasks as a single bar trace with array-valued attributes
+        gantt_tasks = data['tasks']
+        fig.add_trace(go.Bar(
+            x=[task['Duration'] for task in gantt_tasks],
+            y=[task['Task'] for task in gantt_tasks],
+            base=[task['Start'] for task in gantt_tasks],
+            orientation='h',
+            marker_color=[task['Color'] for task in gantt_tasks],
+            text=[f"{task['Task']}<br>Duration: {task['Duration']} days<br>Resource: {task['Resource']}"
+                  for task in gantt_tasks],
+            hoverinfo='text',
+            textposition='inside',
+            texttemplate='%{text}',
+            textfont=dict(size=10)
+        ))
         
         # Update layout
         fig.update_layout(
@@ -612,7 +1011,7 @@ class GanttChart:
         )
         
         if output_format.lower() == 'html':
-            return fig.to_html(full_html=False, include_plotlyjs='cdn')
+            return pio.to_html(fig, full_html=False, include_plotlyjs='cdn', validate=False)
         
         return fig
     
@@ -634,23 +1033,185 @@ class GanttChart:
                 return False
                 
             if format.lower() == 'html':
-                with open(filename, 'w') as f:
-                    f.write(fig.to_html(full_html=True, include_plotlyjs='cdn'))
+                pio.write_html(fig, filename, full_html=True, include_plotlyjs='cdn', validate=False)
             else:
                 fig.write_image(filename, format=format.lower())
                 
             return True
         except Exception as e:
-            print(f"Error exporting Gantt chart: {e}")
+            logger.error("Error exporting Gantt chart: %s", e)
             return False
 
 # =============================================================================
 # AI Optimizer
 # =============================================================================
 
+# Number of Gemini responses kept by the prompt cache
+PROMPT_CACHE_SIZE = 512
+# Cosine similarity above which a cached response is reused for a near-duplicate prompt
+PROMPT_SIMILARITY_THRESHOLD = 0.95
+# Gemini model used for suggestions
+GEMINI_MODEL = 'gemini-2.0-flash'
+# Gemini endpoint and transport ('grpc' or 'rest'; unset keeps the SDK defaults, which the
+# async calls rely on). The SDK keeps one client, and so one pooled connection, per service.
+GEMINI_API_ENDPOINT = 'generativelanguage.googleapis.com'
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT') or None
+# Lifetime of the server-side cached system prompt
+SYSTEM_PROMPT_TTL = timedelta(hours=1)
+# Gemini model used to embed prompts for the similarity lookup
+EMBEDDING_MODEL = 'models/text-embedding-004'
+# Task lists longer than PROMPT_MAX_TASKS are cut to the PROMPT_TOP_TASKS longest tasks
+PROMPT_MAX_TASKS = 100
+PROMPT_TOP_TASKS = 50
+# Cap on the length of a Gemini response
+MAX_OUTPUT_TOKENS = 1024
+GENERATION_CONFIG = {'max_output_tokens': MAX_OUTPUT_TOKENS}
+# Upper bound on concurrent Gemini requests from one batch, to stay under the API rate limits
+MAX_CONCURRENT_REQUESTS = 8
+
+# Structured output for get_optimization_suggestions
+_LEVEL = {'type': 'string', 'enum': ['high', 'medium', 'low']}
+SUGGESTIONS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'suggestions': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'title': {'type': 'string'},
+                    'description': {'type': 'string'},
+                    'priority': _LEVEL,
+                    'impact': _LEVEL,
+                    'effort': _LEVEL
+                },
+                'required': ['title', 'description']
+            }
+        }
+    },
+    'required': ['suggestions']
+}
+SUGGESTIONS_CONFIG = {
+    **GENERATION_CONFIG,
+    'response_mime_type': 'application/json',
+    'response_schema': SUGGESTIONS_SCHEMA
+}
+
+def _to_hours(duration: Any) -> float:
+    """Read a task duration as hours, treating missing or malformed values as 0."""
+    try:
+        hours = float(duration)
+    except (TypeError, ValueError):
+        return 0.0
+    return hours if np.isfinite(hours) else 0.0
+
+def _prompt_key(*parts: Any) -> str:
+    """Hash the canonicalized parts of a prompt into a cache key."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+class _PromptCache:
+    """
+    Bounded cache of Gemini responses.
+    
+    Responses are looked up by exact prompt key first (LRU), then by cosine similarity
+    of the prompt embedding against every cached embedding in a single matrix product.
+    Similarity hits are restricted to entries cached under the same scope (e.g. a hash
+    of the prompt's context), so only the wording of a question can vary.
+    """
+    
+    def __init__(self, maxsize: int = PROMPT_CACHE_SIZE, threshold: float = PROMPT_SIMILARITY_THRESHOLD):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._exact: 'OrderedDict[str, str]' = OrderedDict()
+        # Unit-normalized embeddings in a ring buffer, allocated once the dimension is known
+        self._embeddings: Optional[np.ndarray] = None
+        self._texts: List[Optional[str]] = [None] * maxsize
+        self._scopes = np.full(maxsize, '', dtype=object)
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the response cached for exactly this prompt key, if any."""
+        with self._lock:
+            text = self._exact.get(key)
+            if text is not None:
+                self._exact.move_to_end(key)
+            return text
+    
+    def get_similar(self, embedding: np.ndarray, scope: str = '') -> Optional[str]:
+        """Return the response of the most similar cached prompt in scope above the threshold, if any."""
+        with self._lock:
+            if not self._size or self._embeddings.shape[1] != embedding.shape[0]:
+                return None
+            scores = self._embeddings[:self._size] @ embedding
+            scores[self._scopes[:self._size] != scope] = -np.inf
+            best = int(scores.argmax())
+            return self._texts[best] if scores[best] > self.threshold else None
+    
+    def put(self, key: str, text: str, embedding: Optional[np.ndarray] = None, scope: str = '') -> None:
+        """Cache a response under its prompt key and, if given, its prompt embedding within scope."""
+        with self._lock:
+            self._exact[key] = text
+            self._exact.move_to_end(key)
+            if len(self._exact) > self.maxsize:
+                self._exact.popitem(last=False)
+            
+            if embedding is None:
+                return
+            if self._embeddings is None or self._embeddings.shape[1] != embedding.shape[0]:
+                self._embeddings = np.empty((self.maxsize, embedding.shape[0]), dtype=np.float32)
+                self._size = self._next = 0
+            self._embeddings[self._next] = embedding
+            self._texts[self._next] = text
+            self._scopes[self._next] = scope
+            self._next = (self._next + 1) % self.maxsize
+            self._size = min(self._size + 1, self.maxsize)
+
+_prompt_cache = _PromptCache()
+
+# Gemini's async client binds to the event loop it was first used on, so every async call
+# runs on one long-lived loop in a background thread, started on first use (not at import,
+# so it is never started before a server forks its workers)
+_ai_loop: Optional[asyncio.AbstractEventLoop] = None
+_ai_loop_lock = threading.Lock()
+
+def run_on_ai_loop(coro: Awaitable) -> Future:
+    """Schedule a coroutine on the AI event loop and return a Future for its result."""
+    global _ai_loop
+    with _ai_loop_lock:
+        if _ai_loop is None:
+            _ai_loop = asyncio.new_event_loop()
+            threading.Thread(target=_ai_loop.run_forever, name='gemini-async', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _ai_loop)
+
 class AIOptimizer:
     """A class for AI-powered task optimization and suggestions."""
     
+    # The Gemini client is configured once per API key and the model is shared by all
+    # instances, so every request reuses the same client and connection pool
+    _configured: Optional[str] = None
+    _shared_model: Optional[Any] = None
+    # Model for get_optimization_suggestions with _SYSTEM_PROMPT attached, and when it must be rebuilt
+    _suggestions_model: Optional[Any] = None
+    _suggestions_expires: float = 0.0
+    
+    # Static instructions for get_optimization_suggestions; only the task list varies per request
+    _SYSTEM_PROMPT: ClassVar[str] = """You are an expert project manager analyzing a project plan. You will be given the project tasks.
+    
+    Please analyze these tasks and provide specific, actionable recommendations to optimize this project.
+    
+    Give your top 3-5 recommendations, most important first. For each recommendation:
+      * title: a short headline
+      * description: the task(s) affected, the specific action to take, the expected benefit
+        and any risks or considerations
+      * priority, impact and effort: each one of "high", "medium" or "low"
+    
+    Focus on practical, implementable suggestions that will have the most impact on project success.
+    
+    If you need any clarification about the tasks, please make reasonable assumptions and state them clearly."""
+    
     def __init__(self, api_key: str = None):
         """
         Initialize the AI Optimizer.
@@ -659,11 +1220,142 @@ class AIOptimizer:
             api_key: Optional Google Gemini API key. If not provided, will try to get from environment.
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.0-flash')
-        else:
-            self.model = None
+    
+    @property
+    def model(self):
+        """The shared Gemini model, created on first use (None if no API key is set)."""
+        if not self.api_key:
+            return None
+        if AIOptimizer._configured != self.api_key:
+            genai.configure(api_key=self.api_key, transport=GEMINI_TRANSPORT,
+                            client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+            AIOptimizer._shared_model = genai.GenerativeModel(GEMINI_MODEL)
+            AIOptimizer._suggestions_model = None
+            AIOptimizer._configured = self.api_key
+        return AIOptimizer._shared_model
+    
+    @property
+    def suggestions_model(self):
+        """
+        The shared model for get_optimization_suggestions, with _SYSTEM_PROMPT as its system instruction.
+        
+        The system prompt is stored server-side with Gemini context caching when the API accepts it
+        (it enforces a minimum cached size), otherwise it is sent with each request.
+        """
+        if not self.model:
+            return None
+        if AIOptimizer._suggestions_model is None or time.monotonic() >= AIOptimizer._suggestions_expires:
+            try:
+                cached = genai.caching.CachedContent.create(
+                    model=GEMINI_MODEL, system_instruction=self._SYSTEM_PROMPT, ttl=SYSTEM_PROMPT_TTL
+                )
+                AIOptimizer._suggestions_model = genai.GenerativeModel.from_cached_content(cached)
+                # Rebuild a minute before the cache entry expires
+                AIOptimizer._suggestions_expires = time.monotonic() + SYSTEM_PROMPT_TTL.total_seconds() - 60
+            except Exception as e:
+                logger.info("Context caching unavailable, sending the system prompt per request: %s", e)
+                AIOptimizer._suggestions_model = genai.GenerativeModel(
+                    GEMINI_MODEL, system_instruction=self._SYSTEM_PROMPT
+                )
+                AIOptimizer._suggestions_expires = float('inf')
+        return AIOptimizer._suggestions_model
+    
+    @staticmethod
+    def _unit_embedding(result: Dict) -> Optional[np.ndarray]:
+        """Turn an embed_content result into a unit vector."""
+        embedding = np.asarray(result['embedding'], dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else None
+    
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Embed a prompt as a unit vector, or return None if the embedding call fails."""
+        try:
+            result = genai.embed_content(model=EMBEDDING_MODEL, content=prompt)
+        except Exception as e:
+            logger.warning("Error embedding prompt: %s", e)
+            return None
+        return self._unit_embedding(result)
+    
+    async def _embed_async(self, prompt: str) -> Optional[np.ndarray]:
+        """Async variant of _embed."""
+        try:
+            result = await genai.embed_content_async(model=EMBEDDING_MODEL, content=prompt)
+        except Exception as e:
+            logger.warning("Error embedding prompt: %s", e)
+            return None
+        return self._unit_embedding(result)
+    
+    @staticmethod
+    def _similar_cached(key: str, embedding: Optional[np.ndarray], scope: str) -> Optional[str]:
+        """Look up a near-duplicate prompt's response and cache it under this prompt's key too."""
+        if embedding is None:
+            return None
+        text = _prompt_cache.get_similar(embedding, scope)
+        if text is not None:
+            _prompt_cache.put(key, text)
+        return text
+    
+    def _generate(self, prompt: str, key: str, generation_config: Dict = GENERATION_CONFIG,
+                  model: Any = None, embed_text: Optional[str] = None, scope: str = '') -> str:
+        """
+        Generate a response for the prompt, reusing a cached one for the same or a near-duplicate prompt.
+        
+        Args:
+            prompt: Full prompt to send to the model
+            key: Cache key from _prompt_key over the canonicalized prompt inputs
+            generation_config: Gemini generation config for the request
+            model: Model to call instead of the shared default one
+            embed_text: Part of the prompt compared for near-duplicates (defaults to the whole prompt)
+            scope: Near-duplicates only match cached responses with the same scope
+            
+        Returns:
+            The response text (empty if the model returned nothing)
+        """
+        text = _prompt_cache.get(key)
+        if text is not None:
+            return text
+        
+        embedding = self._embed(embed_text or prompt)
+        text = self._similar_cached(key, embedding, scope)
+        if text is not None:
+            return text
+        
+        text = (model or self.model).generate_content(prompt, generation_config=generation_config).text
+        # Don't cache empty responses so the next request retries
+        if text:
+            _prompt_cache.put(key, text, embedding, scope)
+        return text
+    
+    async def _generate_async(self, prompt: str, key: str, generation_config: Dict = GENERATION_CONFIG,
+                              model: Any = None, embed_text: Optional[str] = None, scope: str = '') -> str:
+        """Async variant of _generate; must run on the AI event loop (see run_on_ai_loop)."""
+        text = _prompt_cache.get(key)
+        if text is not None:
+            return text
+        
+        embedding = await self._embed_async(embed_text or prompt)
+        text = self._similar_cached(key, embedding, scope)
+        if text is not None:
+            return text
+        
+        response = await (model or self.model).generate_content_async(prompt, generation_config=generation_config)
+        text = response.text
+        # Don't cache empty responses so the next request retries
+        if text:
+            _prompt_cache.put(key, text, embedding, scope)
+        return text
+    
+    @staticmethod
+    def _extract(task: Dict, i: int) -> Tuple[Any, Any, Any, Any, str]:
+        """Pull (id, name, duration, resource, dependency list text) out of a task dict."""
+        task_id = task.get('Task ID', task.get('task_id', f'Task {i}'))
+        task_name = task.get('Task Name', task.get('task_name', f'Task {i}'))
+        duration = task.get('Duration', task.get('duration', 0))
+        resource = task.get('Resource', task.get('resource', 'Unassigned'))
+        deps = task.get('Dependencies', task.get('dependencies', []))
+        if isinstance(deps, str):
+            deps = [d.strip() for d in deps.split(',') if d.strip()]
+        return task_id, task_name, duration, resource, ', '.join(map(str, deps)) or 'None'
     
     def get_optimization_suggestions(self, tasks: List[Dict], question: str = None) -> List[Dict]:
         """
@@ -690,62 +1382,40 @@ class AIOptimizer:
             
         try:
             # Prepare task data for the prompt
-            task_list = []
-            for i, task in enumerate(tasks, 1):
-                task_id = task.get('Task ID', task.get('task_id', f'Task {i}'))
-                task_name = task.get('Task Name', task.get('task_name', f'Task {i}'))
-                duration = task.get('Duration', task.get('duration', 0))
-                resource = task.get('Resource', task.get('resource', 'Unassigned'))
-                deps = task.get('Dependencies', task.get('dependencies', []))
-                if isinstance(deps, str):
-                    deps = [d.strip() for d in deps.split(',') if d.strip()]
-                
-                task_list.append(f"{i}. {task_name} "
-                              f"(ID: {task_id}, "
-                              f"Duration: {duration}h, "
-                              f"Resource: {resource}, "
-                              f"Dependencies: {', '.join(deps) or 'None'})")
+            task_key = [self._extract(task, i) for i, task in enumerate(tasks, 1)]
+            listed, summary = task_key, ''
+            if len(task_key) > PROMPT_MAX_TASKS:
+                # Keep only the longest tasks in the prompt and summarize the rest in one line
+                hours = np.fromiter((_to_hours(t[2]) for t in task_key), dtype=np.float64, count=len(task_key))
+                order = np.argsort(-hours, kind='stable')
+                listed = [task_key[j] for j in order[:PROMPT_TOP_TASKS]]
+                rest_sum = hours[order[PROMPT_TOP_TASKS:]].sum()
+                summary = f"\n+{len(task_key) - PROMPT_TOP_TASKS} other tasks totaling {rest_sum:g} hours"
+            task_lines = "\n".join(
+                f"{i}. {task_name} (ID: {task_id}, Duration: {duration}h, "
+                f"Resource: {resource}, Dependencies: {deps})"
+                for i, (task_id, task_name, duration, resource, deps) in enumerate(listed, 1)
+            ) + summary
             
-            # Create a detailed prompt with clear instructions
-            prompt = f"""You are an expert project manager analyzing a project plan. Here are the project tasks:
+            # The instructions live in the model's system prompt; only the task list is sent
+            prompt = f"Here are the project tasks:\n\n{task_lines}"
             
-            {chr(10).join(task_list)}
+            response_text = self._generate(prompt, _prompt_key('suggestions', task_key),
+                                           generation_config=SUGGESTIONS_CONFIG, model=self.suggestions_model)
             
-            Please analyze these tasks and provide specific, actionable recommendations to optimize this project. 
-            
-            Your analysis should include:
-            1. **Project Overview**: Brief summary of key observations about the project
-            2. **Top Recommendations** (3-5 items):
-               - For each recommendation:
-                 * Task(s) affected
-                 * Specific action to take
-                 * Expected benefit
-                 * Any risks or considerations
-            3. **Additional Insights**: Any other observations that could help improve the project
-            
-            Focus on practical, implementable suggestions that will have the most impact on project success.
-            
-            If you need any clarification about the tasks, please make reasonable assumptions and state them clearly."""
-            
-            response = self.model.generate_content(prompt)
-            
-            # Process the response into structured suggestions
+            # The response is JSON matching SUGGESTIONS_SCHEMA
             suggestions = []
-            if response.text:
-                # Split the response into individual suggestions
-                suggestion_texts = [s.strip() for s in response.text.split('\n') if s.strip()]
-                
-                for i, text in enumerate(suggestion_texts, 1):
-                    if text and len(text) > 10:  # Simple validation for non-empty suggestions
-                        suggestions.append({
-                            'type': 'suggestion',
-                            'title': f'Optimization Suggestion {i}',
-                            'description': text,
-                            'priority': 'high' if i == 1 else 'medium',
-                            'task_id': None,  # Can be linked to specific tasks if needed
-                            'impact': 'high',
-                            'effort': 'medium'
-                        })
+            if response_text:
+                parsed = json.loads(response_text)
+                suggestions = [{
+                    'type': 'suggestion',
+                    'title': item.get('title') or f'Optimization Suggestion {i}',
+                    'description': item.get('description', ''),
+                    'priority': item.get('priority', 'medium'),
+                    'task_id': None,  # Can be linked to specific tasks if needed
+                    'impact': item.get('impact', 'medium'),
+                    'effort': item.get('effort', 'medium')
+                } for i, item in enumerate(parsed.get('suggestions', []), 1)]
             
             return suggestions if suggestions else [{
                 'type': 'info',
@@ -755,7 +1425,7 @@ class AIOptimizer:
             }]
             
         except Exception as e:
-            print(f"Error generating AI suggestions: {e}")
+            logger.error("Error generating AI suggestions: %s", e)
             return [{
                 'type': 'error',
                 'title': 'Error Generating Suggestions',
@@ -763,6 +1433,17 @@ class AIOptimizer:
                 'priority': 'high'
             }]
     
+    @staticmethod
+    def _suggestion_prompt(prompt: str, context: Optional[Dict]) -> str:
+        """Wrap a user question and its context in the assistant prompt."""
+        return f"""You are a helpful project management assistant. Please provide a concise and helpful response to the following question.
+            
+            Context: {json.dumps(context, indent=2) if context else 'No additional context provided.'}
+            
+            Question: {prompt}
+            
+            Response:"""
+    
     def get_ai_suggestion(self, prompt: str, context: Dict = None) -> str:
         """
         Get a response from the AI model based on the given prompt and context.
@@ -778,162 +1459,220 @@ class AIOptimizer:
             return "AI service is not configured. Please set the GEMINI_API_KEY environment variable."
         
         try:
-            full_prompt = f"""You are a helpful project management assistant. Please provide a concise and helpful response to the following question.
-            
-            Context: {json.dumps(context, indent=2) if context else 'No additional context provided.'}
+            full_prompt = self._suggestion_prompt(prompt, context)
+            response_text = self._generate(full_prompt, _prompt_key('suggest', prompt, context),
+                                           embed_text=prompt, scope=_prompt_key('suggest', context))
+            return response_text if response_text else "I couldn't generate a response. Please try again."
             
-            Question: {prompt}
-            
-            Response:"""
+        except Exception as e:
+            return f"Error generating response: {str(e)}"
+    
+    async def get_ai_suggestion_async(self, prompt: str, context: Dict = None) -> str:
+        """
+        Async variant of get_ai_suggestion; must run on the AI event loop (see run_on_ai_loop).
+        
+        Args:
+            prompt: User's question or prompt
+            context: Optional context dictionary
             
-            response = self.model.generate_content(full_prompt)
-            return response.text if response.text else "I couldn't generate a response. Please try again."
+        Returns:
+            AI-generated response as a string
+        """
+        if not self.model:
+            return "AI service is not configured. Please set the GEMINI_API_KEY environment variable."
+        
+        try:
+            full_prompt = self._suggestion_prompt(prompt, context)
+            response_text = await self._generate_async(full_prompt, _prompt_key('suggest', prompt, context),
+                                                       embed_text=prompt, scope=_prompt_key('suggest', context))
+            return response_text if response_text else "I couldn't generate a response. Please try again."
             
         except Exception as e:
             return f"Error generating response: {str(e)}"
 
+    async def get_ai_suggestions_async(self, prompts: List[str], context: Dict = None) -> List[str]:
+        """
+        Answer several prompts concurrently, at most MAX_CONCURRENT_REQUESTS at a time.
+        
+        Args:
+            prompts: User questions or prompts
+            context: Optional context dictionary shared by all prompts
+            
+        Returns:
+            AI-generated responses, in the same order as the prompts
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        
+        async def suggest(prompt: str) -> str:
+            async with semaphore:
+                return await self.get_ai_suggestion_async(prompt, context)
+        
+        return await asyncio.gather(*(suggest(prompt) for prompt in prompts))
+
 # =============================================================================
 # Flask Application
 # =============================================================================
 
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, which also serializes NumPy values natively."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['EXPORT_FOLDER'] = 'exports'
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Set to True to keep a copy of each upload in UPLOAD_FOLDER while running in debug mode
+app.config['SAVE_UPLOADS'] = False
+# Let a fronting web server (e.g. nginx with X-Sendfile/X-Accel-Redirect) send export files
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true')
+
+# Export file names are timestamped and never rewritten, so clients may cache them
+EXPORT_MAX_AGE = 3600
+
+# Size and lifetime (seconds) of the cache of editor graph exports
+EXPORT_CACHE_SIZE = 256
+EXPORT_CACHE_TTL = 300
+
+# Number and lifetime (seconds) of background AI suggestion jobs kept for polling
+AI_JOB_CACHE_SIZE = 256
+AI_JOB_TTL = 600
 os.makedirs(app.config['EXPORT_FOLDER'], exist_ok=True)
 
+# Load environment variables before the AIOptimizer reads GEMINI_API_KEY
+load_dotenv()
+
 # Initialize the GraphEditor and AIOptimizer
 graph_editor = GraphEditor()
 ai_optimizer = AIOptimizer()
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Editor graph exports keyed by (kind, graph version); cachetools caches need external locking
+_export_cache = TTLCache(maxsize=EXPORT_CACHE_SIZE, ttl=EXPORT_CACHE_TTL)
+_export_lock = threading.Lock()
+
+# Background AI suggestion jobs started by /api/analyze?ai_suggestions=true, keyed by job id
+# until fetched or expired. Jobs live in the worker process that started them, so polling
+# behind several workers needs sticky sessions.
+JOBS: 'TTLCache[str, Future]' = TTLCache(maxsize=AI_JOB_CACHE_SIZE, ttl=AI_JOB_TTL)
+_jobs_lock = threading.Lock()
+executor = ThreadPoolExecutor(max_workers=4)
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
-def analyze_workflow(tasks: List[Dict]) -> Dict:
+def cached_export(kind: str) -> Union[List[Dict], Dict]:
+    """
+    Export the editor graph, reusing the previous export until the graph changes.
+    
+    Args:
+        kind: 'tasks' for GraphEditor.export_tasks, 'graph' for export_graph('json')
+        
+    Returns:
+        The export, which may be shared between requests and should be treated as read-only
+    """
+    key = (kind, graph_editor.version)
+    with _export_lock:
+        result = _export_cache.get(key)
+    if result is None:
+        result = graph_editor.export_tasks() if kind == 'tasks' else graph_editor.export_graph('json')
+        with _export_lock:
+            _export_cache[key] = result
+    return result
+
+def _save_upload_copy(file, folder: str) -> str:
+    """
+    Save a debugging copy of an uploaded file under a unique, sanitized name and rewind its stream.
+    
+    Args:
+        file: The uploaded FileStorage
+        folder: Directory to save into (created on first use)
+        
+    Returns:
+        Path of the saved copy
+    """
+    os.makedirs(folder, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=folder, delete=False,
+                                     prefix=f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_",
+                                     suffix=f"_{secure_filename(file.filename or 'upload.csv')}") as copy:
+        file.save(copy)
+    file.stream.seek(0)
+    return copy.name
+
+def _iter_chunks(text: str, size: int = 8192) -> Iterator[str]:
+    """Yield a string in chunks of at most `size` characters."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def analyze_workflow(tasks: List[Dict], include_graph: bool = False, ai_suggestions: bool = False) -> Dict:
     """
     Analyze a workflow using the CriticalPathAnalyzer.
     
     Args:
         tasks: List of task dictionaries
+        include_graph: Whether to include the dependency graph (node-link JSON) for the editor view
+        ai_suggestions: Whether to start a background AI suggestion job (see /api/ai/job/<job_id>)
         
     Returns:
         Dictionary with analysis results
     """
     try:
-        print("=== Starting workflow analysis ===")
-        print(f"Received {len(tasks)} tasks for analysis")
-        
-        # Convert tasks to the format expected by GraphEditor
-        graph_editor.clear_graph()
-        
-        # First pass: add all nodes
-        for task in tasks:
-            # Handle both string and numeric task IDs
-            task_id = str(task.get('Task ID', task.get('task_id', ''))).strip()
-            if not task_id:
-                print(f"Skipping task with empty ID: {task}")
-                continue
-                
-            # Get duration with fallback to estimated_time
-            duration = 0
-            try:
-                duration = int(float(task.get('Duration', task.get('duration', task.get('estimated_time', 0)))))
-                if duration <= 0:
-                    print(f"Warning: Task {task_id} has invalid duration {duration}, defaulting to 1")
-                    duration = 1
-            except (ValueError, TypeError) as e:
-                print(f"Error parsing duration for task {task_id}: {e}, using default 1")
-                duration = 1
-            
-            # Add the node
-            try:
-                graph_editor.add_node(
-                    node_id=task_id,
-                    label=task.get('Task Name', task.get('task_name', f'Task {task_id}')),
-                    duration=duration,
-                    resource=task.get('Resource', task.get('resource', 'Unassigned')),
-                    dependencies=task.get('Dependencies', task.get('dependencies', ''))
-                )
-                print(f"Added task {task_id} with duration {duration}")
-            except Exception as e:
-                print(f"Error adding task {task_id}: {e}")
-                continue
+        logger.debug("=== Starting workflow analysis ===")
+        logger.debug("Received %d tasks for analysis", len(tasks))
         
-        # Get the graph for analysis
-        graph = graph_editor.get_graph()
-        if not graph.nodes:
+        # The analyzer is built straight from the request's tasks
+        cpa = build_analyzer(tasks)
+        if not cpa.graph:
             raise ValueError("No valid tasks found in the graph")
             
-        print(f"Graph has {len(graph.nodes)} nodes and {len(graph.edges)} edges")
+        logger.debug("Graph has %d nodes and %d edges", len(cpa.graph.nodes), len(cpa.graph.edges))
         
-        # Initialize CriticalPathAnalyzer with the graph
-        tasks_for_analysis = graph_editor.export_tasks()
-        print(f"Exported {len(tasks_for_analysis)} tasks for analysis")
+        # Every task with its parsed duration and scheduled start
+        tasks_for_analysis = cpa.get_schedule()
         
-        cpa = CriticalPathAnalyzer(tasks_for_analysis)
+        # The analyzed tasks become the editor graph, which the /api/gantt routes export
+        graph_editor.load_tasks(tasks_for_analysis)
+        
+        # Get AI suggestions in the background only on request, since each job is a paid
+        # Gemini call; the client polls /api/ai/job/<job_id> for them
+        job_id = None
+        if ai_suggestions:
+            job_id = uuid.uuid4().hex
+            future = executor.submit(ai_optimizer.get_optimization_suggestions, tasks_for_analysis)
+            with _jobs_lock:
+                JOBS[job_id] = future
         
         # Get the critical path with detailed information
-        critical_path = []
-        try:
-            critical_nodes = cpa.get_critical_path()
-            print(f"Found {len(critical_nodes)} tasks in critical path")
-            
-            for node in critical_nodes:
-                if node not in cpa.graph.nodes:
-                    print(f"Warning: Critical node {node} not found in graph")
-                    continue
-                    
-                node_data = cpa.graph.nodes[node]
-                task_info = {
-                    'id': node,
-                    'name': node_data.get('name', f'Task {node}'),
-                    'duration': node_data.get('duration', 0),
-                    'resource': node_data.get('resource', 'Unassigned'),
-                    'early_start': node_data.get('early_start', 0),
-                    'early_finish': node_data.get('early_finish', 0),
-                    'late_start': node_data.get('late_start', 0),
-                    'late_finish': node_data.get('late_finish', 0),
-                    'slack': node_data.get('slack', 0),
-                    'is_critical': True,
-                    'dependencies': node_data.get('dependencies', [])
-                }
-                critical_path.append(task_info)
-                print(f"Critical task: {task_info['name']} (ID: {node}), "
-                      f"Duration: {task_info['duration']}, "
-                      f"ES: {task_info['early_start']}, "
-                      f"EF: {task_info['early_finish']}, "
-                      f"Slack: {task_info['slack']}")
-        except Exception as e:
-            print(f"Error getting critical path: {e}")
-            traceback.print_exc()
-            raise
+        pred = cpa.graph.pred
+        critical_path = [dict(task, dependencies=list(pred[task['id']])) for task in cpa.get_critical_path()]
+        logger.debug("Found %d tasks in critical path", len(critical_path))
+        if logger.isEnabledFor(logging.DEBUG):
+            for task_info in critical_path:
+                logger.debug("Critical task: %s (ID: %s), Duration: %s, ES: %s, EF: %s, Slack: %s",
+                             task_info['name'], task_info['id'], task_info['duration'],
+                             task_info['early_start'], task_info['early_finish'], task_info['slack'])
         
         # Get bottlenecks
         bottlenecks = cpa.identify_bottlenecks()
         
-        # Get AI suggestions
-        ai_optimizer = AIOptimizer()
-        ai_suggestions = ai_optimizer.get_optimization_suggestions(tasks_for_analysis)
-        
         # Generate Gantt chart data
-        gantt = GanttChart()
-        gantt_data = gantt.generate_gantt_data(tasks_for_analysis)
+        gantt_data = GanttChart().generate_gantt_data(tasks_for_analysis)
         
-        # Get graph data with critical path and bottleneck information
-        graph_data = graph_editor.export_graph('json')
+        # Get graph data only for the editor view
+        graph_data = nx.node_link_data(cpa.graph) if include_graph else None
         
         return {
             'critical_path': critical_path,
             'bottlenecks': bottlenecks,
-            'ai_suggestions': ai_suggestions,
+            'ai_suggestions': [],
+            'ai_job_id': job_id,
             'gantt_data': gantt_data,
             'graph_data': graph_data,
             'project_duration': cpa.get_project_duration(),
@@ -942,8 +1681,7 @@ def analyze_workflow(tasks: List[Dict]) -> Dict:
         }
         
     except Exception as e:
-        print(f"Error in analyze_workflow: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in analyze_workflow: %s", e)
         return {
             'error': str(e),
             'critical_path': [],
@@ -975,34 +1713,27 @@ def analyze():
             return jsonify({'error': 'No selected file', 'success': False}), 400
             
         if file:
-            # Save the file temporarily
-            filename = os.path.join(app.config['UPLOAD_FOLDER'], 
-                                  f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-            file.save(filename)
+            # Keep a copy of the upload only when debugging with SAVE_UPLOADS enabled
+            if app.debug and app.config['SAVE_UPLOADS']:
+                _save_upload_copy(file, app.config['UPLOAD_FOLDER'])
             
-            try:
-                # Read and parse the CSV
-                df = pd.read_csv(filename)
-                tasks = df.to_dict('records')
-                
-                # Analyze the workflow
-                result = analyze_workflow(tasks)
-                
-                return jsonify(result)
-                
-            finally:
-                # Clean up the temporary file
-                try:
-                    os.remove(filename)
-                except:
-                    pass
+            # Parse the CSV straight from the upload stream
+            df = pd.read_csv(file.stream)
+            tasks = df.to_dict('records')
+            
+            # Analyze the workflow
+            result = analyze_workflow(tasks, include_graph=request.args.get('include_graph') == 'true',
+                                      ai_suggestions=request.args.get('ai_suggestions') == 'true')
+            
+            return jsonify(result)
                     
     except Exception as e:
-        return jsonify({
-            'error': str(e),
-            'trace': traceback.format_exc(),
-            'success': False
-        }), 500
+        logger.exception("Error in /api/analyze: %s", e)
+        response = {'error': str(e), 'success': False}
+        # Only format the traceback for clients when debugging
+        if app.debug:
+            response['trace'] = traceback.format_exc()
+        return jsonify(response), 500
 
 @app.route('/api/graph/update', methods=['POST'])
 def update_graph():
@@ -1043,7 +1774,7 @@ def update_graph():
         
         return jsonify({
             'success': True,
-            'graph': graph_editor.export_graph('json')
+            'graph': cached_export('graph')
         })
     except Exception as e:
         return jsonify({
@@ -1055,7 +1786,7 @@ def update_graph():
 def get_gantt_data():
     """Get Gantt chart data for the current graph."""
     try:
-        tasks = graph_editor.export_tasks()
+        tasks = cached_export('tasks')
         gantt = GanttChart()
         gantt_data = gantt.generate_gantt_data(tasks)
         return jsonify(gantt_data)
@@ -1067,12 +1798,13 @@ def export_gantt():
     """Export the Gantt chart in the specified format."""
     try:
         format_type = request.args.get('format', 'png')
-        tasks = graph_editor.export_tasks()
+        tasks = cached_export('tasks')
         gantt = GanttChart()
         
         if format_type == 'html':
-            html_content = gantt.generate_gantt_chart(tasks, output_format='html')
-            return html_content
+            html_content = gantt.generate_gantt_chart(tasks, output_format='html') or ''
+            # Send the page in chunks rather than as one response body
+            return Response(_iter_chunks(html_content), mimetype='text/html')
         else:
             filename = f"gantt_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_type}"
             filepath = os.path.join(app.config['EXPORT_FOLDER'], filename)
@@ -1080,7 +1812,9 @@ def export_gantt():
             return send_from_directory(
                 app.config['EXPORT_FOLDER'],
                 filename,
-                as_attachment=True
+                as_attachment=True,
+                conditional=True,
+                max_age=EXPORT_MAX_AGE
             )
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 400
@@ -1106,18 +1840,61 @@ def get_ai_suggestion():
             'success': False
         }), 400
 
+@app.route('/api/ai/suggest/batch', methods=['POST'])
+def get_ai_suggestions_batch():
+    """Get AI-generated suggestions for several prompts sharing one context."""
+    try:
+        data = request.get_json()
+        prompts = data.get('prompts', [])
+        context = data.get('context', {})
+        if not isinstance(prompts, list):
+            return jsonify({'error': 'prompts must be a list', 'success': False}), 400
+        
+        # The prompts are answered concurrently on the AI event loop; this worker waits for all of them
+        suggestions = run_on_ai_loop(ai_optimizer.get_ai_suggestions_async(prompts, context)).result()
+        
+        return jsonify({
+            'suggestions': suggestions,
+            'success': True
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'success': False
+        }), 400
+
+@app.route('/api/ai/job/<job_id>', methods=['GET'])
+def get_ai_job(job_id):
+    """Get the AI suggestions computed in the background for an /api/analyze request."""
+    with _jobs_lock:
+        future = JOBS.get(job_id)
+        if future is None:
+            return jsonify({'error': 'Unknown job ID', 'success': False}), 404
+        if not future.done():
+            return jsonify({'status': 'pending', 'success': True})
+        
+        # Finished jobs are handed out once
+        JOBS.pop(job_id, None)
+    try:
+        suggestions = future.result()
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e), 'success': False}), 500
+    return jsonify({'status': 'done', 'suggestions': suggestions, 'success': True})
+
 @app.route('/exports/<path:filename>')
 def serve_export(filename):
     """Serve exported files from the exports directory."""
-    return send_from_directory(app.config['EXPORT_FOLDER'], filename)
+    return send_from_directory(app.config['EXPORT_FOLDER'], filename,
+                               conditional=True, max_age=EXPORT_MAX_AGE)
 
 # =============================================================================
 # Main Execution
 # =============================================================================
 
 if __name__ == '__main__':
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    
     # Create necessary directories
-    os.makedirs('uploads', exist_ok=True)
     os.makedirs('exports', exist_ok=True)
     
     # Run the application
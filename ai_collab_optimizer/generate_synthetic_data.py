@@ -1,35 +1,41 @@
+import numpy as np
 import pandas as pd
-import random
 
 def generate_synthetic_data(num_tasks=20, team_members=None, seed=42):
-    random.seed(seed)
+    rng = np.random.default_rng(seed)
     if team_members is None:
         team_members = ["Sumit","Shivam","Dhruv","Aryan","Ujjwal","Tanisha","Vidhi"]
 
-    tasks = []
-    for i in range(1, num_tasks + 1):
-        task_id = i
-        name = f"Task {i}"
-        assigned_to = random.choice(team_members)
-        estimated_time = round(random.uniform(2, 40), 1)  # hours
-        
-        # Dependencies: choose from earlier tasks only
-        if i > 1 and random.random() < 0.4:  # 40% chance to have deps
-            dep_count = random.randint(1, min(3, i - 1))
-            dependencies = ";".join(map(str, random.sample(range(1, i), dep_count)))
-        else:
-            dependencies = ""
-        
-        tasks.append({
-            "task_id": task_id,
-            "name": name,
-            "assigned_to": assigned_to,
-            "estimated_time": estimated_time,
-            "dependencies": dependencies
-        })
+    task_ids = np.arange(1, num_tasks + 1)
+    assigned_to = rng.choice(team_members, size=num_tasks)
+    estimated_time = rng.uniform(2, 40, size=num_tasks).round(1)  # hours
 
-    df = pd.DataFrame(tasks)
-    df.to_csv("synthetic_tasks.csv", index=False)
+    # Dependencies: choose from earlier tasks only
+    earlier = np.maximum(task_ids - 1, 1)
+    has_deps = (task_ids > 1) & (rng.random(num_tasks) < 0.4)  # 40% chance to have deps
+    dep_count = np.where(has_deps, rng.integers(1, np.minimum(3, earlier) + 1), 0)
+
+    # Draw three distinct earlier tasks per row, shifting each pick past the ones taken
+    first = rng.integers(0, earlier)
+    second = rng.integers(0, np.maximum(earlier - 1, 1))
+    second += second >= first
+    third = rng.integers(0, np.maximum(earlier - 2, 1))
+    third += third >= np.minimum(first, second)
+    third += third >= np.maximum(first, second)
+
+    picks = [pd.Series(pick + 1).astype(str) for pick in (first, second, third)]
+    dependencies = picks[0].where(dep_count >= 1, "")
+    dependencies = dependencies.where(dep_count < 2, dependencies + ";" + picks[1])
+    dependencies = dependencies.where(dep_count < 3, dependencies + ";" + picks[2])
+
+    df = pd.DataFrame({
+        "task_id": task_ids,
+        "name": "Task " + pd.Series(task_ids).astype(str),
+        "assigned_to": assigned_to,
+        "estimated_time": estimated_time,
+        "dependencies": dependencies
+    })
+    df.to_csv("synthetic_tasks.csv", index=False, chunksize=10_000)
     return df
 
 # Example usage
@@ -0,0 +1,148 @@
+import io
+import random
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as app_module
+from app import JOBS, CriticalPathAnalyzer, _PromptCache, _task_fingerprint, app, build_analyzer
+
+
+def make_tasks(dependencies):
+    """Build tasks of 2 hours each from a {task_id: 'dep;dep'} mapping."""
+    return [
+        {'task_id': str(task_id), 'name': f'Task {task_id}', 'estimated_time': 2, 'dependencies': deps}
+        for task_id, deps in dependencies.items()
+    ]
+
+
+# Cycles with no start task, with no end task, and with neither reachable from the other
+CYCLIC_TASKS = [
+    {1: '2', 2: '1'},
+    {1: '', 2: '1;3', 3: '2'},
+    {4: '5', 5: '4', 6: '5'},
+]
+
+
+def test_blank_duration_in_first_row():
+    csv = "Task ID,Task Name,Duration (days),Dependencies\n1,Design,,\n2,Build,5,1\n3,Test,5,2\n"
+    analyzer = build_analyzer(pd.read_csv(io.StringIO(csv)).to_dict('records'))
+    assert [task['Duration'] for task in analyzer.get_schedule()] == [1, 40, 40]
+    assert analyzer.get_project_duration() == 81
+    
+    # The empty cell stays in the fingerprint, and re-reading the same CSV reuses the analyzer
+    tasks = pd.read_csv(io.StringIO(csv)).to_dict('records')
+    assert dict(_task_fingerprint(tasks)[0])['Duration (days)'] is None
+    assert build_analyzer(tasks) is analyzer
+
+
+def test_minimum_viable_paths_on_cyclic_tasks():
+    for dependencies in CYCLIC_TASKS:
+        analyzer = CriticalPathAnalyzer(make_tasks(dependencies))
+        assert analyzer.get_minimum_viable_paths() == []
+
+
+def test_minimum_viable_paths_on_acyclic_tasks():
+    analyzer = CriticalPathAnalyzer(make_tasks({1: '', 2: '1', 3: '1', 4: '2;3'}))
+    paths = analyzer.get_minimum_viable_paths()
+    assert [[task['id'] for task in path] for path in paths] == [['1', '2', '4'], ['1', '3', '4']]
+
+
+def test_paths_by_duration_on_cyclic_tasks():
+    for dependencies in CYCLIC_TASKS:
+        analyzer = CriticalPathAnalyzer(make_tasks(dependencies))
+        assert list(analyzer._iter_paths_by_duration()) == []
+
+
+def test_paths_by_duration_are_ascending_and_limited():
+    tasks = make_tasks({1: '', 2: '1', 3: '1', 4: '1', 5: '2;3;4'})
+    for task, hours in zip(tasks, [1, 3, 1, 2, 1]):
+        task['estimated_time'] = hours
+    analyzer = CriticalPathAnalyzer(tasks)
+    durations = [duration for duration, _ in analyzer._iter_paths_by_duration()]
+    assert durations == sorted(durations) and len(durations) == 3
+    paths = analyzer.get_minimum_viable_paths(max_paths=2)
+    assert [[task['id'] for task in path] for path in paths] == [['1', '3', '5'], ['1', '4', '5']]
+
+
+def test_prompt_cache_similarity_is_scoped():
+    cache = _PromptCache(maxsize=4)
+    question = np.array([1.0, 0.0], dtype=np.float32)
+    cache.put('task-1', 'answer for task 1', question, scope='context-1')
+    assert cache.get_similar(question, scope='context-1') == 'answer for task 1'
+    assert cache.get_similar(question, scope='context-2') is None
+    assert cache.get_similar(question) is None
+
+
+@pytest.fixture
+def offline_ai(monkeypatch):
+    """Run without a Gemini key (even one loaded from .env), with no AI jobs left over between tests."""
+    monkeypatch.setattr(app_module.ai_optimizer, 'api_key', None)
+    JOBS.clear()
+    yield
+    JOBS.clear()
+
+
+def test_analyze_starts_ai_job_only_on_request(offline_ai):
+    csv = b"task_id,name,estimated_time,dependencies\n1,Design,2,\n2,Build,3,1\n"
+    client = app.test_client()
+    
+    result = client.post('/api/analyze', data={'file': (io.BytesIO(csv), 'tasks.csv')}).get_json()
+    assert result['success'] and result['ai_job_id'] is None
+    assert len(JOBS) == 0
+    
+    result = client.post('/api/analyze?ai_suggestions=true',
+                         data={'file': (io.BytesIO(csv), 'tasks.csv')}).get_json()
+    JOBS[result['ai_job_id']].result(timeout=10)
+    assert client.get(f"/api/ai/job/{result['ai_job_id']}").get_json()['status'] == 'done'
+    assert len(JOBS) == 0
+
+
+def test_gantt_routes_follow_the_last_analyze(offline_ai):
+    csv = b"task_id,name,estimated_time,dependencies\n1,Design,2,\n2,Build,3,1\n"
+    client = app.test_client()
+    
+    assert client.post('/api/analyze', data={'file': (io.BytesIO(csv), 'tasks.csv')}).get_json()['success']
+    gantt = client.get('/api/gantt/data').get_json()
+    assert [task['Task_ID'] for task in gantt['tasks']] == ['1', '2']
+    assert [task['Duration'] for task in gantt['tasks']] == [2, 3]
+
+
+@pytest.fixture
+def stub_ai(monkeypatch):
+    """Answer prompts with canned replies instead of Gemini, starting from no AI event loop."""
+    async def generate_async(prompt, key, **kwargs):
+        return f"Stub reply {key}"
+    
+    monkeypatch.setattr(app_module.AIOptimizer, 'model', property(lambda self: object()))
+    monkeypatch.setattr(app_module.ai_optimizer, '_generate', lambda prompt, key, **kwargs: f"Stub reply {key}")
+    monkeypatch.setattr(app_module.ai_optimizer, '_generate_async', generate_async)
+    monkeypatch.setattr(app_module, '_ai_loop', None)
+
+
+def test_ai_routes_start_the_event_loop_lazily(stub_ai):
+    client = app.test_client()
+    
+    result = client.post('/api/ai/suggest', json={'prompt': 'How do I shorten the plan?'}).get_json()
+    assert result['success'] and result['suggestion'].startswith('Stub reply')
+    assert app_module._ai_loop is None
+    
+    result = client.post('/api/ai/suggest/batch', json={'prompts': ['One?', 'Two?']}).get_json()
+    assert result['success'] and len(set(result['suggestions'])) == 2
+    assert all(suggestion.startswith('Stub reply') for suggestion in result['suggestions'])
+    assert app_module._ai_loop is not None and app_module._ai_loop.is_running()
+
+
+def test_descendant_counts_in_blocks(monkeypatch):
+    rng = random.Random(7)
+    analyzer = CriticalPathAnalyzer(make_tasks({
+        i: ';'.join(str(d) for d in rng.sample(range(1, i), min(i - 1, 3))) for i in range(1, 301)
+    }))
+    expected = [len(nx.descendants(analyzer.graph, node)) for node in analyzer._nodes]
+    assert analyzer._descendant_counts().tolist() == expected
+    
+    # 300 nodes x 1 word per sweep, so five sweeps of 64 targets each
+    monkeypatch.setattr(app_module, 'DESCENDANT_BITSET_BYTES', 300 * 8)
+    assert analyzer._descendant_counts().tolist() == expected
@@ -1,10 +1,19 @@
 import streamlit as st
 import pandas as pd
 import networkx as nx
-from pyvis.network import Network
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 import openai
-import tempfile
 import os
+import io
+import json
+import re
+import time
+import asyncio
+import hashlib
+import diskcache
+from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 # ----------------------------
 # 1. OpenAI API Configuration
@@ -21,27 +30,170 @@ try:
 except Exception:
     AI_ENABLED = False
 
-def suggest_solution(task_name, assigned_to):
+# Concurrency and rate limits for one-request-per-task suggestions
+MAX_CONCURRENT_REQUESTS = 3
+REQUESTS_PER_MIN = 60
+TOKENS_PER_MIN = 40000
+SUGGESTION_MAX_TOKENS = 150
+
+# Suggestions persist on disk for a week, shared across sessions and processes
+SUGGESTION_CACHE_TTL = 7 * 86400
+suggestion_cache = diskcache.Cache(os.path.expanduser('~/.cache/collab_opt'))
+
+def suggestion_key(task):
+    """Hash the prompt inputs for a task into a stable cache key."""
+    payload = {'model': 'gpt-3.5-turbo', 'name': task['name'], 'assigned_to': task['assigned_to']}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def suggest_solutions_batch(tasks: list[dict]) -> dict[int, str]:
     """
-    Use GPT to suggest ways to reduce workload or reassign tasks.
+    Use GPT to suggest ways to reduce workload or reassign a batch of tasks.
+
+    Tasks without a cached suggestion go out in a single request as a numbered
+    list; the reply is mapped back to each task by its index in ``tasks``.
     """
     if not AI_ENABLED:
-        return "AI suggestions are disabled. Please set up your OpenAI API key to enable this feature."
-        
+        message = "AI suggestions are disabled. Please set up your OpenAI API key to enable this feature."
+        return {i: message for i in range(len(tasks))}
+
+    keys = [suggestion_key(t) for t in tasks]
+    results = {i: suggestion_cache.get(key) for i, key in enumerate(keys)}
+    pending = [i for i, suggestion in results.items() if suggestion is None]
+    if not pending:
+        return results
+
+    task_list = "\n".join(
+        f"{n}. Task '{tasks[i]['name']}' assigned to {tasks[i]['assigned_to']}"
+        for n, i in enumerate(pending)
+    )
     prompt = f"""
-    Task '{task_name}' assigned to {assigned_to} is a potential bottleneck in a project.
-    Suggest 2-3 actionable ways to reduce workload, split the task, or reassign it.
-    Keep the response concise and focused on practical solutions.
+    The following tasks are potential bottlenecks in a project:
+    {task_list}
+
+    For each task, suggest 2-3 actionable ways to reduce workload, split the task, or reassign it.
+    Keep each response concise and focused on practical solutions.
+    Return JSON: {{"0": "...", "1": "..."}}
     """
     try:
         response = openai.ChatCompletion.create(
             model="gpt-3.5-turbo",  # Using 3.5 as it's more widely available
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=150
+            max_tokens=150 * len(pending)
         )
-        return response['choices'][0]['message']['content'].strip()
+        content = response['choices'][0]['message']['content'].strip()
     except Exception as e:
-        return f"Error generating suggestion: {str(e)}. Please check your OpenAI API key and internet connection."
+        message = f"Error generating suggestion: {str(e)}. Please check your OpenAI API key and internet connection."
+        results.update((i, message) for i in pending)
+        return results
+
+    try:
+        parsed = json.loads(content)
+        suggestions = {int(k): str(v).strip() for k, v in parsed.items()}
+    except (ValueError, TypeError, AttributeError):
+        # Fall back to splitting a plain numbered list
+        parts = [p.strip() for p in re.split(r'^\d+\.', content, flags=re.MULTILINE)]
+        suggestions = dict(enumerate(p for p in parts if p))
+
+    for n, i in enumerate(pending):
+        # Empty replies aren't cached, so the next request retries them
+        if suggestions.get(n):
+            results[i] = suggestions[n]
+            suggestion_cache.set(keys[i], suggestions[n], expire=SUGGESTION_CACHE_TTL)
+        else:
+            results[i] = "No suggestion returned for this task."
+    return results
+
+class TokenBucket:
+    """
+    Leaky-bucket limiter that waits until both a request slot and enough
+    tokens are available before letting a call through.
+    """
+    def __init__(self, requests_per_min, tokens_per_min):
+        self.capacity = {'requests': requests_per_min, 'tokens': tokens_per_min}
+        self.available = dict(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        for kind, capacity in self.capacity.items():
+            self.available[kind] = min(capacity, self.available[kind] + capacity * elapsed / 60)
+
+    async def acquire(self, tokens):
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.available['requests'] >= 1 and self.available['tokens'] >= tokens:
+                    self.available['requests'] -= 1
+                    self.available['tokens'] -= tokens
+                    return
+                await asyncio.sleep(0.1)
+
+async def _suggest_one(task, sem, bucket, placeholder=None):
+    """
+    Request a suggestion for a single task, throttled and bounded by ``sem``.
+
+    The reply is streamed, and the text so far is shown in ``placeholder`` as it arrives.
+    """
+    key = suggestion_key(task)
+    cached = suggestion_cache.get(key)
+    if cached is not None:
+        return cached
+
+    prompt = f"""
+    Task '{task['name']}' assigned to {task['assigned_to']} is a potential bottleneck in a project.
+    Suggest 2-3 actionable ways to reduce workload, split the task, or reassign it.
+    Keep the response concise and focused on practical solutions.
+    """
+
+    @retry(wait=wait_random_exponential(min=1, max=20), stop=stop_after_attempt(4), reraise=True)
+    async def _call():
+        # Rough token estimate: ~4 characters per token plus the completion budget
+        await bucket.acquire(len(prompt) // 4 + SUGGESTION_MAX_TOKENS)
+        return await openai.ChatCompletion.acreate(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=SUGGESTION_MAX_TOKENS,
+            stream=True
+        )
+
+    async with sem:
+        try:
+            parts = []
+            async for chunk in await _call():
+                parts.append(chunk['choices'][0]['delta'].get('content', ''))
+                if placeholder is not None:
+                    placeholder.markdown(''.join(parts))
+            suggestion = ''.join(parts).strip()
+            # Empty replies aren't cached, so the next request retries them
+            if not suggestion:
+                return "No suggestion returned for this task."
+            suggestion_cache.set(key, suggestion, expire=SUGGESTION_CACHE_TTL)
+            return suggestion
+        except Exception as e:
+            return f"Error generating suggestion: {str(e)}. Please check your OpenAI API key and internet connection."
+
+async def _suggest_all(tasks, placeholders):
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    bucket = TokenBucket(REQUESTS_PER_MIN, TOKENS_PER_MIN)
+    return await asyncio.gather(*(
+        _suggest_one(t, sem, bucket, placeholders.get(i)) for i, t in enumerate(tasks)
+    ))
+
+def suggest_solutions_concurrent(tasks: list[dict], placeholders=None) -> dict[int, str]:
+    """
+    Use GPT to suggest improvements with one request per task, sent concurrently.
+
+    If given, ``placeholders`` maps task indexes to st.empty() slots that show
+    each reply while it streams in.
+    """
+    if not AI_ENABLED:
+        message = "AI suggestions are disabled. Please set up your OpenAI API key to enable this feature."
+        return {i: message for i in range(len(tasks))}
+
+    return dict(enumerate(asyncio.run(_suggest_all(tasks, placeholders or {}))))
 
 # ----------------------------
 # 2. Streamlit App
@@ -55,27 +207,21 @@ Upload your project task CSV with columns:
 - `estimated_time` should be in hours
 """)
 
-# Add example data
-example_data = {
-    'task_id': [1, 2, 3, 4, 5],
-    'name': ['Design UI', 'Build Backend', 'API Integration', 'Testing', 'Documentation'],
-    'assigned_to': ['Alice', 'Bob', 'Charlie', 'Dave', 'Eve'],
-    'estimated_time': [5, 8, 4, 3, 2],
-    'dependencies': ['', '1', '2', '2;3', '3']
-}
-
-# Create example download
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode('utf-8')
-
-csv = convert_df_to_csv(pd.DataFrame(example_data))
+# Example data, kept as ready-encoded CSV so reruns don't rebuild a DataFrame for it
+_EXAMPLE_CSV = (
+    b"task_id,name,assigned_to,estimated_time,dependencies\n"
+    b"1,Design UI,Alice,5,\n"
+    b"2,Build Backend,Bob,8,1\n"
+    b"3,API Integration,Charlie,4,2\n"
+    b"4,Testing,Dave,3,2;3\n"
+    b"5,Documentation,Eve,2,3\n"
+)
 
 download_col, _ = st.columns(2)
 with download_col:
     st.download_button(
         label="📥 Download Example CSV",
-        data=csv,
+        data=_EXAMPLE_CSV,
         file_name='example_tasks.csv',
         mime='text/csv',
     )
@@ -87,7 +233,29 @@ if uploaded_file is None:
     st.warning("👆 Please upload a CSV file or use the example data.")
     st.stop()
 
-df = pd.read_csv(uploaded_file)
+# Column types for uploaded CSVs, so pandas skips type inference on them
+SCHEMA = {
+    'task_id': 'int64',
+    'name': 'string',
+    'assigned_to': 'string',
+    'estimated_time': 'float64',
+    'dependencies': 'string'
+}
+
+# Use the multithreaded pyarrow CSV reader when it is installed
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+@st.cache_data
+def load_tasks(csv_bytes):
+    return pd.read_csv(io.BytesIO(csv_bytes), engine=CSV_ENGINE, dtype=SCHEMA)
+
+# Analysis below is cached on the uploaded bytes, so widget reruns skip it
+csv_bytes = uploaded_file.getvalue()
+df = load_tasks(csv_bytes)
 
 # Validate required columns
 required_columns = ['task_id', 'name', 'assigned_to', 'estimated_time', 'dependencies']
@@ -95,57 +263,205 @@ if not all(col in df.columns for col in required_columns):
     st.error(f"❌ Error: CSV must contain these columns: {', '.join(required_columns)}")
     st.stop()
 
+# Reassignments confirmed in this session are patched over the cached data on each
+# rerun, keyed by the upload so they don't carry over to a different file
+reassignments = st.session_state.setdefault(f"reassignments_{hashlib.sha1(csv_bytes).hexdigest()}", {})
+for node, assignee in reassignments.items():
+    df.loc[df['task_id'] == node, 'assigned_to'] = assignee
+
 st.subheader("📋 Task Data Overview")
 st.dataframe(df, use_container_width=True)
 
 # ----------------------------
 # 3. Build Task Graph
 # ----------------------------
-G = nx.DiGraph()
-for _, row in df.iterrows():
-    G.add_node(
-        row['task_id'], 
-        name=row['name'], 
-        assigned_to=row['assigned_to'], 
-        time=row['estimated_time']
+def set_bits(mask):
+    """Yield the indices of the set bits in ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def topological_order(succ, indegree):
+    """
+    Kahn's algorithm over index adjacency lists.
+
+    Returns the visited indices in topological order; fewer than len(succ) of
+    them means the graph has a cycle.
+    """
+    remaining = list(indegree)
+    order = [i for i, d in enumerate(remaining) if d == 0]
+    for u in order:
+        for v in succ[u]:
+            remaining[v] -= 1
+            if remaining[v] == 0:
+                order.append(v)
+    return order
+
+def longest_path(pred, order, times):
+    """
+    Find the longest path through a DAG, weighting each node by ``times``.
+
+    ``order`` is a topological order of the node indices; the path may start at
+    any node, so each distance is its own time plus the best predecessor's (if positive).
+    """
+    if not order:
+        return []
+    dist = [0.0] * len(pred)
+    parent = [-1] * len(pred)
+    for v in order:
+        best = 0.0
+        for u in pred[v]:
+            if dist[u] > best:
+                best, parent[v] = dist[u], u
+        dist[v] = best + times[v]
+
+    path = []
+    node = int(np.argmax(dist))
+    while node != -1:
+        path.append(node)
+        node = parent[node]
+    return path[::-1]
+
+@st.cache_data
+def analyze(csv_bytes: bytes):
+    """
+    Build the task graph for an uploaded CSV and find its critical path and bottlenecks.
+
+    Works on index adjacency lists rather than a networkx graph, and returns plain
+    dicts and lists (node attributes, edge list, analysis results) so the result
+    can be cached and the graph rebuilt cheaply on each rerun.
+    """
+    df = load_tasks(csv_bytes)
+    ids = df['task_id'].tolist()
+    attrs = df[['name', 'assigned_to', 'estimated_time']].rename(columns={'estimated_time': 'time'}).to_dict('records')
+    nodes = dict(zip(ids, attrs))
+
+    # One (dependency, task) row per listed dependency
+    edges = (
+        df[['task_id', 'dependencies']]
+        .assign(dep=df['dependencies'].astype('string').str.split(';'))
+        .explode('dep')
+    )
+    edges['dep'] = edges['dep'].str.strip()
+    edges = edges[edges['dep'].notna() & (edges['dep'] != '')]
+    dep_ids = pd.to_numeric(edges['dep'], errors='coerce')
+    invalid = edges[dep_ids.isna()]
+    warnings = [
+        f"Skipping invalid dependency: {dep} for task {task_id}"
+        for dep, task_id in zip(invalid['dep'], invalid['task_id'])
+    ]
+    edges = (
+        pd.DataFrame({'dep': dep_ids, 'task_id': edges['task_id']})
+        .dropna()
+        .astype({'dep': int})
+        .drop_duplicates()
     )
-    if pd.notna(row['dependencies']) and str(row['dependencies']).strip():
-        deps = [d.strip() for d in str(row['dependencies']).split(';') if d.strip()]
-        for dep in deps:
-            try:
-                G.add_edge(int(dep), row['task_id'])
-            except ValueError:
-                st.warning(f"Skipping invalid dependency: {dep} for task {row['task_id']}")
+
+    # Dependencies that aren't tasks in the CSV still become (attribute-less) nodes
+    for dep in edges['dep'].tolist():
+        if dep not in nodes:
+            nodes[dep] = {}
+
+    # Dependencies per task, counted straight from the edge frame (in task order)
+    in_degree = edges['task_id'].value_counts(sort=False)
+
+    # Index adjacency lists
+    node_list = list(nodes)
+    n = len(node_list)
+    index = {node: i for i, node in enumerate(node_list)}
+    src = [index[u] for u in edges['dep'].tolist()]
+    dst = [index[v] for v in edges['task_id'].tolist()]
+    succ = [[] for _ in range(n)]
+    pred = [[] for _ in range(n)]
+    for u, v in zip(src, dst):
+        succ[u].append(v)
+        pred[v].append(u)
+    times = [attrs.get('time', 0) for attrs in nodes.values()]
+
+    # Calculate critical path
+    order = topological_order(succ, np.bincount(dst, minlength=n).tolist())
+    has_cycle = len(order) < n
+    critical_path = []
+    if not has_cycle:
+        path_times = np.nan_to_num(np.array(times, dtype=float)).tolist()
+        critical_path = [node_list[i] for i in longest_path(pred, order, path_times)]
+    total_time = sum(nodes[node].get('time', 0) for node in critical_path)
+
+    # Find bottlenecks (nodes with multiple dependencies or high workload)
+    bottlenecks = in_degree[in_degree > 1].index.tolist()
+
+    # Calculate workload as sum of task time and all dependent tasks. Reachable tasks are
+    # int bitmasks over the strongly connected components (a cycle collapses into one),
+    # OR-ed successors-first in one reverse topological pass so shared tasks count once
+    if has_cycle:
+        graph = csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+        n_comp, comp_of = connected_components(graph, directed=True, connection='strong')
+        comp_of = comp_of.tolist()
+        comp_succ = [set() for _ in range(n_comp)]
+        for u, v in zip(src, dst):
+            if comp_of[u] != comp_of[v]:
+                comp_succ[comp_of[u]].add(comp_of[v])
+        comp_indegree = [0] * n_comp
+        for targets in comp_succ:
+            for c in targets:
+                comp_indegree[c] += 1
+        comp_order = topological_order(comp_succ, comp_indegree)
+    else:
+        n_comp, comp_of, comp_succ, comp_order = n, list(range(n)), succ, order
+
+    reach = [0] * n_comp
+    for i, comp in enumerate(comp_of):
+        reach[comp] |= 1 << i
+    component_workload = [0] * n_comp
+    for comp in reversed(comp_order):
+        mask = reach[comp]
+        for c in comp_succ[comp]:
+            mask |= reach[c]
+        reach[comp] = mask
+        component_workload[comp] = sum(times[i] for i in set_bits(mask))
+    workload = {node: component_workload[comp_of[i]] for i, node in enumerate(node_list)}
+
+    # Sort by workload
+    bottlenecks = sorted(bottlenecks, key=lambda x: workload.get(x, 0), reverse=True)
+
+    return {
+        'nodes': nodes,
+        'edges': [(node_list[u], node_list[v]) for u in range(n) for v in succ[u]],
+        'warnings': warnings,
+        'critical_path': critical_path,
+        'has_cycle': has_cycle,
+        'total_time': total_time,
+        'bottlenecks': bottlenecks,
+        'in_degree': in_degree.to_dict(),
+        'workload': workload
+    }
+
+analysis = analyze(csv_bytes)
+for warning in analysis['warnings']:
+    st.warning(warning)
+
+G = nx.DiGraph()
+G.add_nodes_from(analysis['nodes'].items())
+G.add_edges_from(analysis['edges'])
+for node, assignee in reassignments.items():
+    G.nodes[node]['assigned_to'] = assignee
 
 # ----------------------------
 # 4. Detect Bottlenecks
 # ----------------------------
 st.subheader("🔍 Bottleneck Analysis")
 
-# Calculate critical path
-try:
-    critical_path = nx.dag_longest_path(G, weight='time')
+critical_path = analysis['critical_path']
+bottlenecks = analysis['bottlenecks']
+workload = analysis['workload']
+
+if analysis['has_cycle']:
+    st.warning("⚠️ Warning: The task graph contains cycles. Please check your dependencies.")
+else:
     critical_path_str = ' → '.join([str(node) for node in critical_path])
     st.info(f"**Critical Path:** {critical_path_str}")
-    
-    # Calculate total time for critical path
-    total_time = sum(G.nodes[node].get('time', 0) for node in critical_path)
-    st.info(f"**Estimated Total Time:** {total_time} hours")
-    
-except nx.NetworkXUnfeasible:
-    st.warning("⚠️ Warning: The task graph contains cycles. Please check your dependencies.")
-
-# Find bottlenecks (nodes with multiple dependencies or high workload)
-bottlenecks = [n for n in G.nodes if G.in_degree(n) > 1]
-workload = {}
-for node in G.nodes():
-    # Calculate workload as sum of task time and all dependent tasks
-    workload[node] = G.nodes[node].get('time', 0)
-    for desc in nx.descendants(G, node):
-        workload[node] += G.nodes[desc].get('time', 0)
-
-# Sort by workload
-bottlenecks = sorted(bottlenecks, key=lambda x: workload.get(x, 0), reverse=True)
+    st.info(f"**Estimated Total Time:** {analysis['total_time']} hours")
 
 if bottlenecks:
     st.warning(f"🚨 Found {len(bottlenecks)} potential bottlenecks in the workflow")
@@ -157,7 +473,7 @@ if bottlenecks:
             'Task Name': task.get('name', ''),
             'Assigned To': task.get('assigned_to', ''),
             'Estimated Time (hours)': task.get('time', 0),
-            'Dependent Tasks': G.in_degree(node),
+            'Dependent Tasks': analysis['in_degree'].get(node, 0),
             'Total Impact (hours)': workload.get(node, 0)
         })
     st.dataframe(pd.DataFrame(bottleneck_data), use_container_width=True)
@@ -167,6 +483,10 @@ else:
 # ----------------------------
 # 5. Generate AI Suggestions
 # ----------------------------
+per_task_suggestions = st.checkbox(
+    "Request suggestions one task at a time",
+    help="Sends a separate, concurrent request per task instead of one combined request"
+)
 if st.button("🤖 Get AI Suggestions"):
     st.subheader("💡 AI-Powered Recommendations")
     
@@ -174,11 +494,13 @@ if st.button("🤖 Get AI Suggestions"):
         st.info("No major bottlenecks found to analyze.")
     else:
         with st.spinner("Analyzing workflow and generating suggestions..."):
-            for node in bottlenecks[:3]:  # Limit to top 3 to save tokens
+            top_bottlenecks = bottlenecks[:3]  # Limit to top 3 to save tokens
+            placeholders = {}
+            for i, node in enumerate(top_bottlenecks):
                 task = G.nodes[node]
                 with st.expander(f"🔧 Task {node}: {task.get('name', '')} (Assigned to {task.get('assigned_to', '?')})"):
-                    suggestion = suggest_solution(task.get('name', ''), task.get('assigned_to', ''))
-                    st.markdown(suggestion)
+                    # Filled in below once the suggestions arrive (or while they stream)
+                    placeholders[i] = st.empty()
                     
                     # Add action buttons
                     col1, col2 = st.columns(2)
@@ -197,101 +519,227 @@ if st.button("🤖 Get AI Suggestions"):
                             key=f"new_assignee_{node}"
                         )
                         if st.button(f"Confirm Reassignment to {new_assignee}", key=f"confirm_reassign_{node}"):
-                            # Update the graph and dataframe
+                            # Patch the graph and dataframe in place; the graph below picks it up
+                            reassignments[node] = new_assignee
                             G.nodes[node]['assigned_to'] = new_assignee
                             df.loc[df['task_id'] == node, 'assigned_to'] = new_assignee
                             st.success(f"Task {node} reassigned to {new_assignee}")
-                            st.rerun()
                     
                     if st.session_state.get(f'split_{node}', False):
                         st.info("Coming soon: Task splitting functionality")
 
+            top_tasks = [
+                {'name': G.nodes[node].get('name', ''), 'assigned_to': G.nodes[node].get('assigned_to', '')}
+                for node in top_bottlenecks
+            ]
+            if per_task_suggestions:
+                suggestions = suggest_solutions_concurrent(top_tasks, placeholders)
+            else:
+                suggestions = suggest_solutions_batch(top_tasks)
+            for i, placeholder in placeholders.items():
+                placeholder.markdown(suggestions[i])
+
 # ----------------------------
 # 6. Visualize Task Graph
 # ----------------------------
 st.subheader("📊 Interactive Task Graph")
 
-# Create Pyvis network
-net = Network(
-    height='600px', 
-    width='100%', 
-    notebook=False, 
-    directed=True,
-    bgcolor='#ffffff',
-    font_color='#2d3436'
-)
+# Custom CSS for better display
+GRAPH_CSS = """
+<style>
+.vis-network:focus, .vis-network:active {
+    outline: none !important;
+}
+.vis-tooltip {
+    max-width: 300px;
+    padding: 10px;
+    border-radius: 5px;
+    background-color: #2c3e50;
+    color: white;
+    font-family: Arial, sans-serif;
+    font-size: 12px;
+    line-height: 1.4;
+}
+</style>
+"""
 
-# Add nodes with styling
-for n, attr in G.nodes(data=True):
-    is_bottleneck = n in bottlenecks
-    is_critical = n in critical_path if 'critical_path' in locals() else False
-    
-    # Determine node color
-    if is_critical and is_bottleneck:
-        color = '#e74c3c'  # Red for critical bottlenecks
-    elif is_critical:
-        color = '#e67e22'  # Orange for critical path
-    elif is_bottleneck:
-        color = '#f1c40f'  # Yellow for bottlenecks
-    else:
-        color = '#2ecc71'  # Green for normal nodes
-    
-    title = f"""
-    <b>Task {n}: {attr.get('name', '')}</b><br>
-    <b>Assigned to:</b> {attr.get('assigned_to', '')}<br>
-    <b>Time:</b> {attr.get('time', 0)} hours<br>
-    <b>Dependencies:</b> {', '.join(str(p) for p in G.predecessors(n)) or 'None'}
+# vis.js is loaded from the CDN at a pinned version (as in the other apps); only the node/edge data is filled in per render
+GRAPH_TEMPLATE = """
+<html>
+<head>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/vis-network@9.1.2/styles/vis-network.css" type="text/css" />
+<script type="text/javascript" src="https://cdn.jsdelivr.net/npm/vis-network@9.1.2/dist/vis-network.min.js"></script>
+<style type="text/css">
+#mynetwork {{
+    width: 100%;
+    height: 600px;
+    background-color: #ffffff;
+    border: 1px solid lightgray;
+    position: relative;
+    float: left;
+}}
+</style>
+</head>
+<body>
+<div id="mynetwork"></div>
+<script type="text/javascript">
+var nodes = new vis.DataSet({nodes});
+var edges = new vis.DataSet({edges});
+var network = new vis.Network(
+    document.getElementById('mynetwork'),
+    {{nodes: nodes, edges: edges}},
+    {options}
+);
+</script>
+</body>
+</html>
+"""
+
+# Repulsion layout
+GRAPH_OPTIONS_JSON = json.dumps({
+    'edges': {'color': {'inherit': True}, 'smooth': {'enabled': True, 'type': 'dynamic'}},
+    'interaction': {'dragNodes': True, 'hideEdgesOnDrag': False, 'hideNodesOnDrag': False},
+    'physics': {
+        'enabled': True,
+        'solver': 'repulsion',
+        'repulsion': {
+            'nodeDistance': 150,
+            'centralGravity': 0.2,
+            'springLength': 200,
+            'springConstant': 0.05,
+            'damping': 0.09
+        },
+        'stabilization': {'enabled': True, 'fit': True, 'iterations': 1000}
+    }
+})
+
+def _script_json(data):
+    """Serialise data for inlining in a <script> block."""
+    return json.dumps(data).replace('</', '<\\/')
+
+def critical_view(G, critical_path, bottlenecks):
     """
-    
-    net.add_node(
-        n, 
-        label=f"{n}: {attr.get('name', '')}", 
-        color=color,
-        title=title,
-        borderWidth=2,
-        shape='box',
-        font={'size': 12, 'face': 'Arial'}
+    Reduce G to the critical path, the bottlenecks and their direct neighbours.
+
+    Returns the kept nodes, the edges between them, and (source, target, hours)
+    summary edges standing in for chains of omitted tasks between kept ones.
+    """
+    core = set(critical_path) | set(bottlenecks)
+    keep = set(core)
+    keep |= {p for n in core for p in G.predecessors(n)}
+    keep |= {s for n in core for s in G.successors(n)}
+
+    edges = [(u, v) for u, v in G.edges() if u in keep and v in keep]
+
+    # For each omitted task, the longest cumulative time (through omitted tasks only)
+    # to every kept task it leads to, filled successors-first; skipped if G has a cycle
+    omitted = G.subgraph(n for n in G.nodes if n not in keep)
+    reach = {}
+    if nx.is_directed_acyclic_graph(omitted):
+        for node in reversed(list(nx.topological_sort(omitted))):
+            hours = G.nodes[node].get('time', 0)
+            targets = {}
+            for succ in G.successors(node):
+                downstream = {succ: 0} if succ in keep else reach[succ]
+                for v, h in downstream.items():
+                    targets[v] = max(targets.get(v, 0), hours + h)
+            reach[node] = targets
+
+    summary_edges = []
+    for u in keep:
+        targets = {}
+        for succ in G.successors(u):
+            for v, h in reach.get(succ, {}).items():
+                targets[v] = max(targets.get(v, 0), h)
+        summary_edges.extend((u, v, hours) for v, hours in targets.items())
+
+    return [n for n in G.nodes if n in keep], edges, summary_edges
+
+@st.cache_data
+def render_graph_html(nodes_tuple, edges_tuple, bottlenecks_tuple, critical_tuple, summary_edges_tuple=()):
+    """
+    Build the vis.js network page and return it as an HTML string.
+
+    Takes (id, name, assigned_to, time, dependencies) node tuples, (source, target)
+    edge tuples and (source, target, hours) summary edges for collapsed chains, so
+    the rendered page is cached on the graph contents and highlights.
+    """
+    bottleneck_set = set(bottlenecks_tuple)
+    critical_set = set(critical_tuple)
+
+    # Add nodes with styling
+    nodes = []
+    for n, name, assigned_to, time_hours, dependencies in nodes_tuple:
+        is_bottleneck = n in bottleneck_set
+        is_critical = n in critical_set
+
+        # Determine node color
+        if is_critical and is_bottleneck:
+            color = '#e74c3c'  # Red for critical bottlenecks
+        elif is_critical:
+            color = '#e67e22'  # Orange for critical path
+        elif is_bottleneck:
+            color = '#f1c40f'  # Yellow for bottlenecks
+        else:
+            color = '#2ecc71'  # Green for normal nodes
+
+        title = f"""
+        <b>Task {n}: {name}</b><br>
+        <b>Assigned to:</b> {assigned_to}<br>
+        <b>Time:</b> {time_hours} hours<br>
+        <b>Dependencies:</b> {', '.join(str(p) for p in dependencies) or 'None'}
+        """
+
+        nodes.append({
+            'id': n,
+            'label': f"{n}: {name}",
+            'color': color,
+            'title': title,
+            'borderWidth': 2,
+            'shape': 'box',
+            'font': {'size': 12, 'face': 'Arial', 'color': '#2d3436'}
+        })
+
+    # Add edges with arrows
+    edges = [
+        {'from': u, 'to': v, 'arrows': 'to', 'width': 1, 'color': '#95a5a6'}
+        for u, v in edges_tuple
+    ]
+    edges.extend(
+        {'from': u, 'to': v, 'arrows': 'to', 'width': 1, 'color': '#95a5a6', 'dashes': True, 'label': f"+{hours:g}h"}
+        for u, v, hours in summary_edges_tuple
+    )
+
+    return GRAPH_CSS + GRAPH_TEMPLATE.format(
+        nodes=_script_json(nodes),
+        edges=_script_json(edges),
+        options=GRAPH_OPTIONS_JSON
     )
 
-# Add edges with arrows
-for u, v in G.edges():
-    net.add_edge(u, v, arrows='to', width=1, color='#95a5a6')
-
-# Improve layout
-net.repulsion(
-    node_distance=150,
-    central_gravity=0.2,
-    spring_length=200,
-    spring_strength=0.05,
-    damping=0.09
+critical_view_only = st.checkbox(
+    "Show critical view only",
+    help="Only show the critical path, bottlenecks and their direct neighbours; "
+         "chains of hidden tasks are drawn as dashed edges labelled with their total time"
 )
+if critical_view_only:
+    shown_nodes, shown_edges, summary_edges = critical_view(G, critical_path, bottlenecks)
+else:
+    shown_nodes, shown_edges, summary_edges = list(G.nodes), list(G.edges()), []
 
 # Generate and display the graph
 with st.spinner("Generating interactive graph..."):
-    tmp_dir = tempfile.gettempdir()
-    path = os.path.join(tmp_dir, "task_graph.html")
-    net.save_graph(path)
-    
-    # Add custom CSS for better display
-    st.components.v1.html("""
-    <style>
-    .vis-network:focus, .vis-network:active {
-        outline: none !important;
-    }
-    .vis-tooltip {
-        max-width: 300px;
-        padding: 10px;
-        border-radius: 5px;
-        background-color: #2c3e50;
-        color: white;
-        font-family: Arial, sans-serif;
-        font-size: 12px;
-        line-height: 1.4;
-    }
-    </style>
-    """ + open(path, 'r', encoding='utf-8').read(), 
-    height=600, 
-    scrolling=False)
+    graph_html = render_graph_html(
+        tuple(
+            (n, G.nodes[n].get('name', ''), G.nodes[n].get('assigned_to', ''), G.nodes[n].get('time', 0),
+             tuple(G.predecessors(n)))
+            for n in shown_nodes
+        ),
+        tuple(shown_edges),
+        tuple(bottlenecks),
+        tuple(critical_path),
+        tuple(summary_edges)
+    )
+    st.components.v1.html(graph_html, height=600, scrolling=False)
 
 # Add legend
 legend = """
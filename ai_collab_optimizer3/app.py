@@ -1,20 +1,56 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from werkzeug.utils import secure_filename
 import pandas as pd
 import networkx as nx
 import json
+import io
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from datetime import datetime
 from dotenv import load_dotenv
 import traceback
+from functools import lru_cache
+from math import fsum
+import hashlib
+import diskcache
 
 app = Flask(__name__)
+# Set to True to keep a copy of each upload in uploads/ while running in debug mode
+app.config['SAVE_UPLOADS'] = False
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Ensure the uploads directory exists
-os.makedirs('uploads', exist_ok=True)
+# Columns the uploaded CSV must have
+REQUIRED_COLUMNS = {'task_id', 'name', 'assigned_to', 'estimated_time', 'dependencies'}
+
+# Column types for the uploaded CSV, so pandas skips type inference on them
+CSV_DTYPES = {'task_id': 'int64', 'name': 'str', 'assigned_to': 'str',
+              'estimated_time': 'float64', 'dependencies': 'str'}
+
+# Parse uploads with the multithreaded pyarrow reader when it is installed; it does not
+# accept a callable usecols, so only the C engine skips unused columns while parsing
+try:
+    import pyarrow  # noqa: F401
+    CSV_READ_OPTIONS = {'engine': 'pyarrow'}
+except ImportError:
+    CSV_READ_OPTIONS = {'usecols': lambda col: col in REQUIRED_COLUMNS}
+
+# Gemini suggestions persist on disk for a week, shared across worker processes
+SUGGESTION_CACHE_TTL = 7 * 86400
+_suggestion_cache = diskcache.Cache(os.path.expanduser('~/.cache/collab_opt'))
+
+# Writes debug copies of uploads off the request path
+_upload_writer = ThreadPoolExecutor(max_workers=1)
+
+def _save_upload_copy(data, filename, timestamp):
+    """Write the raw bytes of an upload to a uniquely named file in uploads/."""
+    os.makedirs('uploads', exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir='uploads', delete=False, prefix=f"{timestamp}_",
+                                     suffix=f"_{secure_filename(filename)}") as copy:
+        copy.write(data)
 
 @app.route('/')
 def index():
@@ -31,38 +67,48 @@ def analyze():
             return jsonify({'error': 'No selected file'}), 400
             
         if file:
-            # Save the file temporarily
-            filename = f"uploads/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-            file.save(filename)
+            # Parse the CSV straight from the upload stream. When debugging with SAVE_UPLOADS
+            # enabled, buffer it once and write the copy from a background thread instead
+            source = file.stream
+            if app.debug and app.config['SAVE_UPLOADS']:
+                data = file.stream.read()
+                _upload_writer.submit(_save_upload_copy, data, file.filename,
+                                     datetime.now().strftime('%Y%m%d_%H%M%S'))
+                source = io.BytesIO(data)
             
-            # Read and parse the CSV
-            df = pd.read_csv(filename)
-            
-            # Clean up the file
-            os.remove(filename)
+            df = pd.read_csv(source, dtype=CSV_DTYPES, **CSV_READ_OPTIONS)
             
             # Validate required columns
-            required_columns = ['task_id', 'name', 'assigned_to', 'estimated_time', 'dependencies']
-            if not all(col in df.columns for col in required_columns):
+            missing = REQUIRED_COLUMNS.difference(df.columns)
+            if missing:
                 return jsonify({
-                    'error': f'Missing required columns. Required: {required_columns}'
+                    'error': f'Missing required columns: {sorted(missing)}'
                 }), 400
             
-            # Process the data
-            tasks = []
-            for _, row in df.iterrows():
-                task = {
-                    'id': int(row['task_id']),
-                    'name': str(row['name']),
-                    'assigned_to': str(row['assigned_to']),
-                    'estimated_time': float(row['estimated_time']) if pd.notna(row['estimated_time']) else 0,
-                    'dependencies': []
+            # Process the data column-wise instead of row by row
+            ids = df['task_id'].astype(int).tolist()
+            names = df['name'].astype(str).tolist()
+            assigned = df['assigned_to'].astype(str).tolist()
+            times = df['estimated_time'].fillna(0).astype(float).tolist()
+            
+            # Parse all dependencies at once: one (task row, dependency) pair per entry,
+            # gathered back into a list of task ids per row
+            deps = df['dependencies'].fillna('').str.split(';').explode().str.strip()
+            deps = pd.to_numeric(deps[deps.ne('')], errors='coerce').dropna().astype(int)
+            deps_lists = deps.groupby(level=0).agg(list).reindex(df.index)
+            deps_series = [dep_ids if isinstance(dep_ids, list) else [] for dep_ids in deps_lists]
+            
+            tasks = [
+                {
+                    'id': task_id,
+                    'name': name,
+                    'assigned_to': assigned_to,
+                    'estimated_time': estimated_time,
+                    'dependencies': deps
                 }
-                
-                if pd.notna(row['dependencies']) and str(row['dependencies']).strip():
-                    task['dependencies'] = [int(dep.strip()) for dep in str(row['dependencies']).split(';') if dep.strip()]
-                
-                tasks.append(task)
+                for task_id, name, assigned_to, estimated_time, deps
+                in zip(ids, names, assigned, times, deps_series)
+            ]
             
             # Analyze the workflow
             analysis = analyze_workflow(tasks)
@@ -80,27 +126,55 @@ def analyze():
         }), 500
 
 def analyze_workflow(tasks):
+    """Analyze the workflow and identify bottlenecks, reusing the result for a repeated task list."""
+    task_key = tuple(
+        (task['id'], task['name'], task['assigned_to'], task['estimated_time'], tuple(task['dependencies']))
+        for task in tasks
+    )
+    return _analyze_cached(task_key)
+
+@lru_cache(maxsize=64)
+def _analyze_cached(task_key):
+    """Run the analysis for a task key built by analyze_workflow (results are shared, treat as read-only)."""
+    tasks = [
+        {'id': task_id, 'name': name, 'assigned_to': assigned_to,
+         'estimated_time': estimated_time, 'dependencies': list(dependencies)}
+        for task_id, name, assigned_to, estimated_time, dependencies in task_key
+    ]
+    return _analyze_workflow(tasks)
+
+def _analyze_workflow(tasks):
     """Analyze the workflow and identify bottlenecks."""
     # Create a directed graph
     G = nx.DiGraph()
     
-    # Add nodes and edges
-    task_map = {task['id']: task for task in tasks}
-    for task in tasks:
-        G.add_node(task['id'], 
-                  name=task['name'],
-                  assigned_to=task['assigned_to'],
-                  estimated_time=task['estimated_time'])
-        
-        for dep_id in task['dependencies']:
-            if dep_id in task_map:
-                G.add_edge(dep_id, task['id'])
+    # Add all nodes, then all edges between known tasks, in bulk
+    G.add_nodes_from(
+        (task['id'], {'name': task['name'],
+                      'assigned_to': task['assigned_to'],
+                      'estimated_time': task['estimated_time']})
+        for task in tasks
+    )
+    G.add_edges_from(
+        (dep_id, task['id'])
+        for task in tasks
+        for dep_id in task['dependencies']
+        if dep_id in G
+    )
     
-    # Find critical path
+    # Sort once; the order doubles as the cycle check and drives the workload pass below
     try:
-        critical_path = nx.dag_longest_path(G, weight='estimated_time')
-        critical_path_str = ' → '.join([str(node) for node in critical_path])
+        topo = list(nx.topological_sort(G))
+        is_dag = True
     except nx.NetworkXUnfeasible:
+        topo = []
+        is_dag = False
+    
+    # Find critical path
+    if is_dag:
+        critical_path = _longest_path(G, topo, 'estimated_time')
+        critical_path_str = ' → '.join([str(node) for node in critical_path])
+    else:
         critical_path = []
         critical_path_str = 'Could not determine (possible cycle in dependencies)'
     
@@ -108,14 +182,35 @@ def analyze_workflow(tasks):
     total_time = sum(G.nodes[node].get('estimated_time', 0) for node in critical_path)
     
     # Find bottlenecks (nodes with multiple dependencies or high workload)
-    bottlenecks = [n for n in G.nodes if G.in_degree(n) > 1]
+    in_degree = dict(G.in_degree())
+    bottlenecks = [n for n, degree in in_degree.items() if degree > 1]
     
-    # Calculate workload for each task
-    workload = {}
-    for node in G.nodes():
-        workload[node] = G.nodes[node].get('estimated_time', 0)
-        for desc in nx.descendants(G, node):
-            workload[node] += G.nodes[desc].get('estimated_time', 0)
+    # Calculate workload for each task: its own time plus that of all its descendants.
+    # Reachable tasks are int bitmasks, OR-ed successors-first in one reverse topological
+    # pass so a task shared by several branches is counted only once. A DAG reuses the
+    # sort above with one component per task; otherwise the pass runs over the
+    # condensation, where a cycle collapses into one component whose tasks reach each other
+    durations = [G.nodes[n].get('estimated_time', 0) for n in G.nodes]
+    if is_dag:
+        component_of = {n: n for n in G.nodes}
+        components = [(n, (n,), G.successors(n)) for n in reversed(topo)]
+    else:
+        condensed = nx.condensation(G)
+        component_of = condensed.graph['mapping']
+        components = [(comp, condensed.nodes[comp]['members'], condensed.successors(comp))
+                      for comp in reversed(list(nx.topological_sort(condensed)))]
+    bit_of = {n: 1 << i for i, n in enumerate(G.nodes)}
+    reach = {}
+    component_workload = {}
+    for comp, members, successors in components:
+        mask = 0
+        for member in members:
+            mask |= bit_of[member]
+        for succ in successors:
+            mask |= reach[succ]
+        reach[comp] = mask
+        component_workload[comp] = fsum(durations[i] for i in _set_bits(mask))
+    workload = {n: component_workload[component_of[n]] for n in G.nodes}
     
     # Sort bottlenecks by workload
     bottlenecks = sorted(bottlenecks, key=lambda x: workload.get(x, 0), reverse=True)
@@ -129,7 +224,7 @@ def analyze_workflow(tasks):
             'name': task.get('name', ''),
             'assigned_to': task.get('assigned_to', ''),
             'estimated_time': task.get('estimated_time', 0),
-            'dependent_tasks': G.in_degree(node),
+            'dependent_tasks': in_degree[node],
             'total_impact': workload.get(node, 0)
         })
     
@@ -138,19 +233,98 @@ def analyze_workflow(tasks):
         'critical_path_str': critical_path_str,
         'total_time': total_time,
         'bottlenecks': bottleneck_data,
-        'has_cycle': nx.is_directed_acyclic_graph(G) is False
+        'has_cycle': not is_dag
     }
 
+def _longest_path(G, order, weight):
+    """Find the longest path through the DAG ``G``, weighting each node by ``weight``.
+
+    ``order`` is a topological order of ``G``. Each task's distance is its own weight
+    plus the best positive distance among its predecessors, so a path may start at
+    any task; the path is walked back from the task with the largest distance.
+    """
+    if not order:
+        return []
+    dist = {}
+    parent = {}
+    for node in order:
+        best, best_pred = 0.0, None
+        for pred in G.pred[node]:
+            if dist[pred] > best:
+                best, best_pred = dist[pred], pred
+        dist[node] = best + G.nodes[node].get(weight, 0)
+        parent[node] = best_pred
+    
+    node = max(order, key=dist.__getitem__)
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    return path[::-1]
+
+def _set_bits(mask):
+    """Yield the indices of the set bits in ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _gemini_error_message(api_error):
+    """Log a Gemini API error and return a user-facing message for it."""
+    print(f"\n=== Gemini API Error ===")
+    print(f"Error Type: {type(api_error).__name__}")
+    print(f"Error Message: {str(api_error)}")
+    # Only format the full traceback when debugging
+    if app.debug:
+        print("\nTraceback:")
+        print(traceback.format_exc())
+    print("======================\n")
+    
+    # More specific error handling for Gemini API
+    error_message = str(api_error)
+    if 'API_KEY_INVALID' in error_message:
+        error_message = 'Invalid Gemini API key. Please check your GEMINI_API_KEY.'
+    elif 'quota' in error_message.lower() or 'billing' in error_message.lower():
+        error_message = 'API quota exceeded. Please check your Google AI Studio billing.'
+    return error_message
+
+def _sse(data, event=None):
+    """Format one server-sent event carrying ``data`` as JSON."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def _stream_suggestion(model, prompt, key):
+    """Yield a Gemini reply as server-sent events, caching the full text once it completes."""
+    parts = []
+    try:
+        for chunk in model.generate_content(prompt, stream=True):
+            if chunk.text:
+                parts.append(chunk.text)
+                yield _sse({'text': chunk.text})
+    except Exception as api_error:
+        yield _sse({'message': f'Error calling Gemini API: {_gemini_error_message(api_error)}',
+                    'type': type(api_error).__name__}, event='error')
+        return
+    
+    suggestion = ''.join(parts).strip()
+    if suggestion:
+        _suggestion_cache.set(key, suggestion, expire=SUGGESTION_CACHE_TTL)
+        print("Successfully streamed response from Gemini")
+    yield _sse({}, event='done')
+
+@lru_cache(maxsize=1)
+def _gemini_model(api_key):
+    """Configure Gemini and build the model once per API key, shared by all requests."""
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.0-flash')
+
 @app.route('/api/ai/suggest', methods=['POST'])
 def get_ai_suggestion():
     try:
         print("\n=== AI Suggestion Request Received ===")
         print("Current working directory:", os.getcwd())
         
-        # Load environment variables
-        load_dotenv()
-        
-        # Get API key from environment variable
+        # Get API key from environment variable (.env is loaded at startup)
         gemini_api_key = os.getenv("GEMINI_API_KEY")
         if not gemini_api_key:
             return jsonify({
@@ -158,9 +332,8 @@ def get_ai_suggestion():
                 'message': 'GEMINI_API_KEY not found in environment variables. Please set it in your .env file.'
             }), 500
             
-        # Initialize Gemini
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        # Reuse the Gemini model configured for this key
+        model = _gemini_model(gemini_api_key)
         
         data = request.get_json()
         if not data:
@@ -193,6 +366,28 @@ def get_ai_suggestion():
         Format the response with clear bullet points and keep it concise (max 5 bullet points).
         """
 
+        # Identical task details reuse the stored suggestion
+        payload = {'model': 'gemini-2.0-flash', 'task_name': task_name, 'assigned_to': assigned_to,
+                   'estimated_time': estimated_time, 'dependencies': dependencies}
+        key = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        suggestion = _suggestion_cache.get(key)
+        
+        # Clients that accept server-sent events get the reply as it is generated
+        if request.accept_mimetypes.best == 'text/event-stream':
+            if suggestion is not None:
+                events = iter([_sse({'text': suggestion}), _sse({}, event='done')])
+            else:
+                print("Streaming request to Gemini API...")
+                events = _stream_suggestion(model, prompt, key)
+            return Response(stream_with_context(events), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache'})
+        
+        if suggestion is not None:
+            return jsonify({
+                'status': 'success',
+                'suggestion': suggestion
+            })
+
         try:
             print("Sending request to Gemini API...")
             
@@ -203,6 +398,7 @@ def get_ai_suggestion():
                 raise Exception("No response text received from Gemini API")
                 
             suggestion = response.text.strip()
+            _suggestion_cache.set(key, suggestion, expire=SUGGESTION_CACHE_TTL)
             print("Successfully received response from Gemini")
             
             return jsonify({
@@ -211,25 +407,9 @@ def get_ai_suggestion():
             })
             
         except Exception as api_error:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"\n=== Gemini API Error ===")
-            print(f"Error Type: {type(api_error).__name__}")
-            print(f"Error Message: {str(api_error)}")
-            print("\nTraceback:")
-            print(error_details)
-            print("======================\n")
-            
-            # More specific error handling for Gemini API
-            error_message = str(api_error)
-            if 'API_KEY_INVALID' in error_message:
-                error_message = 'Invalid Gemini API key. Please check your GEMINI_API_KEY.'
-            elif 'quota' in error_message.lower() or 'billing' in error_message.lower():
-                error_message = 'API quota exceeded. Please check your Google AI Studio billing.'
-                
             return jsonify({
                 'status': 'error',
-                'message': f'Error calling Gemini API: {error_message}',
+                'message': f'Error calling Gemini API: {_gemini_error_message(api_error)}',
                 'type': type(api_error).__name__
             }), 500
         
@@ -1,5 +1,5 @@
+import numpy as np
 import pandas as pd
-import random
 import os
 
 def generate_synthetic_data(num_tasks=20, team_sets=None, seed=42, output_dir="synthetic_data"):
@@ -15,39 +15,47 @@ def generate_synthetic_data(num_tasks=20, team_sets=None, seed=42, output_dir="s
     Returns:
         dict: {team_name: DataFrame}
     """
-    random.seed(seed)
+    rng = np.random.default_rng(seed)
     os.makedirs(output_dir, exist_ok=True)
     results = {}
 
+    task_ids = np.arange(1, num_tasks + 1)
+    names = "Task " + pd.Series(task_ids).astype(str)
+    earlier = np.maximum(task_ids - 1, 1)
+
     for idx, team_members in enumerate(team_sets, start=1):
-        tasks = []
-        for i in range(1, num_tasks + 1):
-            task_id = i
-            name = f"Task {i}"
-            assigned_to = random.choice(team_members)
-            estimated_time = round(random.uniform(2, 40), 1)  # hours
+        assigned_to = rng.choice(team_members, size=num_tasks)
+        estimated_time = rng.uniform(2, 40, size=num_tasks).round(1)  # hours
+
+        # Dependencies: choose from earlier tasks only
+        has_deps = (task_ids > 1) & (rng.random(num_tasks) < 0.4)  # 40% chance to have deps
+        dep_count = np.where(has_deps, rng.integers(1, np.minimum(3, earlier) + 1), 0)
 
-            # Dependencies: choose from earlier tasks only
-            if i > 1 and random.random() < 0.4:  # 40% chance to have deps
-                dep_count = random.randint(1, min(3, i - 1))
-                dependencies = ";".join(map(str, random.sample(range(1, i), dep_count)))
-            else:
-                dependencies = ""
+        # Draw three distinct earlier tasks per row, shifting each pick past the ones taken
+        first = rng.integers(0, earlier)
+        second = rng.integers(0, np.maximum(earlier - 1, 1))
+        second += second >= first
+        third = rng.integers(0, np.maximum(earlier - 2, 1))
+        third += third >= np.minimum(first, second)
+        third += third >= np.maximum(first, second)
 
-            tasks.append({
-                "task_id": task_id,
-                "name": name,
-                "assigned_to": assigned_to,
-                "estimated_time": estimated_time,
-                "dependencies": dependencies
-            })
+        picks = [pd.Series(pick + 1).astype(str) for pick in (first, second, third)]
+        dependencies = picks[0].where(dep_count >= 1, "")
+        dependencies = dependencies.where(dep_count < 2, dependencies + ";" + picks[1])
+        dependencies = dependencies.where(dep_count < 3, dependencies + ";" + picks[2])
 
-        df = pd.DataFrame(tasks)
+        df = pd.DataFrame({
+            "task_id": task_ids,
+            "name": names,
+            "assigned_to": assigned_to,
+            "estimated_time": estimated_time,
+            "dependencies": dependencies
+        })
 
         # Save with team label
         team_name = "_".join(team_members).replace(" ", "_")
         filename = f"{output_dir}/synthetic_tasks_{team_name}.csv"
-        df.to_csv(filename, index=False)
+        df.to_csv(filename, index=False, chunksize=10_000)
 
         results[team_name] = df
         print(f"✅ Saved: {filename}")
@@ -0,0 +1,13 @@
+"""Gunicorn settings for production: run ``gunicorn app:app`` from this directory.
+
+AI suggestions spend seconds waiting on the Gemini API, so each worker runs
+many threads; throughput scales with workers x threads. The app is not
+preloaded, so each worker imports it (and creates its Gemini client) itself.
+"""
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5001')
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+timeout = 120
@@ -247,22 +247,35 @@ class CollaborationOptimizer {
                 return;
             }
             
+            // Lay out a card per task first so each suggestion can stream into its own card
+            const topTasks = bottlenecks.slice(0, 3); // Limit to top 3
             let suggestions = '<div class="suggestions-list">';
             suggestions += '<h6 class="mb-3">AI-Powered Optimization Suggestions</h6>';
+            topTasks.forEach((task, index) => {
+                suggestions += `
+                    <div class="suggestion-item mb-3 p-2 border rounded" id="ai-suggestion-${index}">
+                        <h6 class="mb-1">${task.name} (${task.assigned_to})</h6>
+                        <div class="small text-muted mb-2">${task.estimated_time}h • Depends on: ${task.dependencies.length} tasks</div>
+                        <div class="suggestion-text text-muted">Analyzing task...</div>
+                    </div>
+                `;
+            });
+            suggestions += '</div>';
+            container.innerHTML = suggestions;
             
-            for (const task of bottlenecks.slice(0, 3)) { // Limit to top 3
+            for (const [index, task] of topTasks.entries()) {
+                const item = document.getElementById(`ai-suggestion-${index}`);
+                const textElement = item.querySelector('.suggestion-text');
                 try {
-                    const suggestion = await this.getAISuggestion(task);
-                    suggestions += `
-                        <div class="suggestion-item mb-3 p-2 border rounded">
-                            <h6 class="mb-1">${task.name} (${task.assigned_to})</h6>
-                            <div class="small text-muted mb-2">${task.estimated_time}h • Depends on: ${task.dependencies.length} tasks</div>
-                            <div class="suggestion-text">${suggestion}</div>
-                        </div>
-                    `;
+                    const suggestion = await this.getAISuggestion(task, (partial) => {
+                        textElement.classList.remove('text-muted');
+                        textElement.textContent = partial;
+                    });
+                    textElement.classList.remove('text-muted');
+                    textElement.innerHTML = suggestion;
                 } catch (error) {
                     console.error(`Error getting suggestion for task ${task.name}:`, error);
-                    suggestions += `
+                    item.outerHTML = `
                         <div class="alert alert-warning p-2 mb-2">
                             <i class="bi bi-exclamation-triangle"></i> 
                             Could not generate suggestion for ${task.name}
@@ -271,9 +284,6 @@ class CollaborationOptimizer {
                 }
             }
             
-            suggestions += '</div>';
-            container.innerHTML = suggestions;
-            
         } catch (error) {
             console.error('Error in showAISuggestions:', error);
             container.innerHTML = `
@@ -285,7 +295,7 @@ class CollaborationOptimizer {
         }
     }
 
-    async getAISuggestion(task) {
+    async getAISuggestion(task, onText) {
         try {
             // Show loading state
             const suggestionElement = document.getElementById(`suggestion-${task.id}`);
@@ -302,7 +312,8 @@ class CollaborationOptimizer {
             const response = await fetch('/api/ai/suggest', {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream'
                 },
                 body: JSON.stringify({
                     task_name: task.name,
@@ -312,22 +323,45 @@ class CollaborationOptimizer {
                 })
             });
 
-            const data = await response.json();
-
-            if (!response.ok) {
-                console.error('API Error:', data);
-                
-                // Handle specific error cases
-                if (data.message?.includes('quota') || data.message?.includes('billing')) {
-                    return `⚠️ API quota exceeded. Please check your Google AI Studio billing.`;
-                } else if (data.message?.includes('API key')) {
-                    return `🔑 API key not configured. Please set GEMINI_API_KEY in .env file.`;
-                } else {
-                    return `❌ Error: ${data.message || 'Failed to get suggestion'}`;
+            // Errors raised before generation starts still come back as JSON
+            if (!(response.headers.get('Content-Type') || '').includes('text/event-stream')) {
+                const data = await response.json();
+                if (!response.ok) {
+                    console.error('API Error:', data);
+                    return this.formatSuggestionError(data);
                 }
+                return data.suggestion || 'No suggestion available';
             }
 
-            return data.suggestion || 'No suggestion available';
+            // Read server-sent events as they arrive, passing the text so far to onText
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let suggestion = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop();
+                for (const rawEvent of events) {
+                    const lines = rawEvent.split('\n');
+                    const eventLine = lines.find(line => line.startsWith('event: '));
+                    const dataLine = lines.find(line => line.startsWith('data: '));
+                    const eventType = eventLine ? eventLine.slice(7) : 'message';
+                    const data = dataLine ? JSON.parse(dataLine.slice(6)) : {};
+                    if (eventType === 'error') {
+                        console.error('API Error:', data);
+                        return this.formatSuggestionError(data);
+                    }
+                    if (eventType === 'message' && data.text) {
+                        suggestion += data.text;
+                        if (onText) onText(suggestion);
+                    }
+                }
+            }
+
+            return suggestion.trim() || 'No suggestion available';
             
         } catch (error) {
             console.error('Error getting AI suggestion:', error);
@@ -335,6 +369,17 @@ class CollaborationOptimizer {
         }
     }
 
+    formatSuggestionError(data) {
+        // Handle specific error cases
+        if (data.message?.includes('quota') || data.message?.includes('billing')) {
+            return `⚠️ API quota exceeded. Please check your Google AI Studio billing.`;
+        } else if (data.message?.includes('API key')) {
+            return `🔑 API key not configured. Please set GEMINI_API_KEY in .env file.`;
+        } else {
+            return `❌ Error: ${data.message || 'Failed to get suggestion'}`;
+        }
+    }
+
     getNodeColor(task) {
         if (task.dependencies.length > 1) {
             return { background: '#f8d7da', border: '#f5c6cb' }; // Red for bottlenecks